@@ -0,0 +1,54 @@
+import sys
+import json
+import argparse
+
+# Compares two benchmark result files produced by benchmarks.run.
+# Run from src/ as: python -m benchmarks.compare old.json new.json
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def compare(old, new, metric="median_ms", threshold=0.10):
+    """
+    Returns (rows, regressions). Each row is (group, name, old, new, ratio);
+    a regression is a row whose ratio exceeds 1 + threshold.
+    """
+    rows, regressions = [], []
+    for group, benches in new["results"].items():
+        old_group = old["results"].get(group, {})
+        for name, stats in benches.items():
+            before = old_group.get(name, {}).get(metric)
+            after = stats.get(metric)
+            ratio = (after / before) if before else None
+            row = (group, name, before, after, ratio)
+            rows.append(row)
+            if ratio is not None and ratio > 1 + threshold:
+                regressions.append(row)
+    return rows, regressions
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--metric", default="median_ms", help="Statistic to compare (median_ms, min_ms, p95_ms...)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Slowdown ratio that counts as a regression")
+    options = parser.parse_args()
+
+    old, new = load(options.old), load(options.new)
+    rows, regressions = compare(old, new, options.metric, options.threshold)
+
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']} ({options.metric})\n")
+    print(f"{'group':<10} {'benchmark':<36} {'old':>12} {'new':>12} {'change':>9}")
+    for group, name, before, after, ratio in rows:
+        before_text = f"{before:.3f}" if before is not None else "-"
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio is not None else "new"
+        flag = "  <-- regression" if ratio is not None and ratio > 1 + options.threshold else ""
+        print(f"{group:<10} {name:<36} {before_text:>12} {after:>12.3f} {change:>9}{flag}")
+
+    if regressions:
+        print(f"\n[!] {len(regressions)} regression(s) above {options.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,95 @@
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# Synthetic data shaped like users.json / hacker_news_articles.json.
+# Seeded so every run (and every commit being compared) sees the same corpus.
+
+WORDS = (
+    "ransomware malware linux windows cloud zero-day exploit patch vulnerability "
+    "phishing botnet credential supply-chain npm python kubernetes docker firmware "
+    "router vpn backdoor espionage threat actor campaign researchers attackers "
+    "security update critical remote code execution privilege escalation data breach"
+).split()
+
+TAGS = ["AI", "Cybersecurity", "Finance", "Cryptocurrency", "Linux", "Cloud",
+        "Ransomware", "Malware", "Privacy", "npm", "Supply Chain", "Zero-day"]
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+def _sentence(rng, words=14):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+def _paragraphs(rng, count):
+    return '\n\n'.join(' '.join(_sentence(rng) for _ in range(4)) for _ in range(count))
+
+def make_users(count, seed=1):
+    rng = random.Random(seed)
+    return [{
+        "email": f"user{i}@example.com",
+        "otp": None,
+        "token": str(uuid.UUID(int=rng.getrandbits(128))),
+        "tags": rng.sample(TAGS, 4),
+        "interests_prompt": _sentence(rng),
+        "last_online": datetime(2025, 1, 1).isoformat()
+    } for i in range(count)]
+
+def make_articles(count, paragraphs=4, seed=2):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    articles = []
+    for i in range(count):
+        articles.append({
+            "title": _sentence(rng, 8),
+            "url": f"https://thehackernews.com/2025/{i % 12 + 1:02d}/article-{i}.html",
+            "thumbnail": f"https://blogger.googleusercontent.com/img/b/article-{i}.jpg",
+            "description": _sentence(rng, 30),
+            "content": _paragraphs(rng, paragraphs),
+            "tags": [{"name": t, "confidence": round(rng.random(), 2)} for t in rng.sample(TAGS, 5)],
+            "source": "The Hacker News",
+            "scraped_at": (start + timedelta(minutes=37 * i)).isoformat()
+        })
+    # Newest first, like the real store
+    articles.reverse()
+    return articles
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+def make_thn_listing(count=12, seed=3):
+    """HTML shaped like the thehackernews.com homepage story list."""
+    rng = random.Random(seed)
+    stories = []
+    for i in range(count):
+        stories.append(f"""
+<div class="body-post clear">
+  <a class="story-link" href="https://thehackernews.com/2025/11/story-{i}.html">
+    <div class="clear home-post-box cf">
+      <div class="home-img clear"><div class="img-ratio">
+        <img alt="story {i}" class="home-img-src lazyload" data-src="https://blogger.googleusercontent.com/img/story-{i}.jpg" src="data:image/png;base64,iVBORw0KGgo="/>
+      </div></div>
+      <div class="clear home-right">
+        <h2 class="home-title">{_sentence(rng, 9)}</h2>
+        <div class="item-label"><span class="h-datetime">Nov 29, 2025</span><span class="h-tags">Vulnerability</span></div>
+        <div class="home-desc">{_sentence(rng, 30)}</div>
+      </div>
+    </div>
+  </a>
+</div>""")
+    return f"<html><head><title>The Hacker News</title></head><body><div class='blog-posts clear'>{''.join(stories)}</div></body></html>"
+
+def make_thn_article(paragraphs=12, seed=4):
+    """HTML shaped like a thehackernews.com article page."""
+    rng = random.Random(seed)
+    body = ''.join(f"<p>{' '.join(_sentence(rng) for _ in range(4))}</p>\n" for _ in range(paragraphs))
+    nav = ''.join(f"<li><a href='/x/{i}'>{rng.choice(WORDS)}</a></li>" for i in range(60))
+    return f"""<html><head><title>{_sentence(rng, 8)}</title></head><body>
+<header><ul class="menu">{nav}</ul></header>
+<div class="main-box"><article class="post">
+<h1 class="story-title">{_sentence(rng, 8)}</h1>
+<div class="articlebody clear cf" id="articlebody">{body}</div>
+</article></div>
+<aside>{nav}</aside><footer>{nav}</footer>
+</body></html>"""
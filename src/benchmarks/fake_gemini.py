@@ -0,0 +1,134 @@
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Gemini REST API (models/<name>:generateContent).
+# Point the backend at it with GEMINI_API_ENDPOINT=http://127.0.0.1:<port>.
+# Run from src/ as: python -m benchmarks.fake_gemini --latency-ms 800 --error-rate 0.05
+
+MODEL_PATH = re.compile(r"/v1(?:beta)?/models/([^/:]+):generateContent")
+
+class FakeGeminiConfig:
+    def __init__(self, latency_ms=500, jitter_ms=200, error_rate=0.0, failing_models=(), interest_rate=0.2):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.failing_models = set(failing_models)   # Always fail: exercises MODELS_TO_TRY fallback
+        self.interest_rate = interest_rate          # Share of interest checks answered with a summary
+        self.calls = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+def _answer(prompt, generation_config, config):
+    """Canned answer shaped like what each ai.py prompt expects."""
+    if generation_config.get("responseMimeType") == "application/json" or \
+            generation_config.get("response_mime_type") == "application/json":
+        if "User Description" in prompt:
+            return json.dumps(["AI", "Cybersecurity", "Cloud", "Linux", "Privacy"])
+        return json.dumps([
+            {"name": "ransomware", "confidence": 0.92},
+            {"name": "linux", "confidence": 0.41},
+            {"name": "npm", "confidence": 0.12}
+        ])
+
+    if "personalized news curator" in prompt:
+        if random.random() < config.interest_rate:
+            return "This story matters to you because it covers a threat in your stack. Patch soon."
+        return "NOT_INTERESTING"
+
+    return "Based on the article, the attackers abused a misconfigured update server. " * 3
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+
+            match = MODEL_PATH.search(self.path)
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                return
+            model = match.group(1)
+
+            delay = max(0.0, config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+            time.sleep(delay)
+
+            with config.lock:
+                config.calls += 1
+                fail = model in config.failing_models or random.random() < config.error_rate
+                if fail:
+                    config.errors += 1
+
+            if fail:
+                self._send_json(503, {"error": {"code": 503, "message": "Injected failure", "status": "UNAVAILABLE"}})
+                return
+
+            try:
+                request = json.loads(raw)
+            except json.JSONDecodeError:
+                request = {}
+            prompt = ' '.join(
+                part.get('text', '')
+                for content in request.get('contents', [])
+                for part in content.get('parts', [])
+            )
+            text = _answer(prompt, request.get('generationConfig', {}), config)
+
+            self._send_json(200, {
+                "candidates": [{
+                    "content": {"parts": [{"text": text}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0
+                }],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4}
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def start(port=0, config=None):
+    """Starts the fake server on a daemon thread. Returns (server, config); server.server_port has the port."""
+    config = config or FakeGeminiConfig()
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, config
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Fake Gemini API server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=500)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--failing-models", default="", help="Comma-separated models that always fail")
+    options = parser.parse_args()
+
+    config = FakeGeminiConfig(
+        options.latency_ms, options.jitter_ms, options.error_rate,
+        [m for m in options.failing_models.split(",") if m]
+    )
+    server, _ = start(options.port, config)
+    print(f"[*] Fake Gemini listening on http://127.0.0.1:{server.server_port}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main_cli()
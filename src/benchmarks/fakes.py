@@ -0,0 +1,56 @@
+import types
+import json
+
+# In-process stand-ins for Gemini and SMTP so benchmarks never touch the network.
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeGenerativeModel:
+    """Mimics google.generativeai.GenerativeModel with canned, instant answers."""
+
+    def __init__(self, model_name=None, generation_config=None):
+        self.model_name = model_name
+        self.generation_config = generation_config or {}
+
+    def generate_content(self, prompt):
+        if self.generation_config.get("response_mime_type") == "application/json":
+            return FakeResponse(json.dumps([{"name": "benchmark", "confidence": 0.9}]))
+        return FakeResponse("NOT_INTERESTING")
+
+def patch_ai(ai_module):
+    """
+    Points utils.ai at the fake model. get_genai() returns the patched module
+    as-is, so neither the real SDK nor an API key is needed.
+    """
+    fake = types.SimpleNamespace(GenerativeModel=FakeGenerativeModel, configure=lambda **kwargs: None)
+    ai_module.genai = fake
+
+class FakeSMTP:
+    """Drop-in for smtplib.SMTP / SMTP_SSL that records messages instead of sending them."""
+    sent = []
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def starttls(self, context=None):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, sender, to, message):
+        FakeSMTP.sent.append((sender, to, len(message)))
+
+def patch_mail(mail_module):
+    """Routes utils.mail through FakeSMTP with dummy credentials."""
+    mail_module.SENDER_EMAIL = "bench@example.com"
+    mail_module.SENDER_PASSWORD = "bench"
+    mail_module.smtplib = types.SimpleNamespace(SMTP=FakeSMTP, SMTP_SSL=FakeSMTP)
@@ -0,0 +1,357 @@
+import io
+import os
+import sys
+import json
+import contextlib
+import time
+import random
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+import requests
+from benchmarks import corpus, fake_gemini, smtp_sink
+
+# End-to-end load generator. By default it spawns main.py against a scratch
+# data directory, wired to a local fake Gemini server and SMTP sink, then
+# drives a weighted traffic mix from N concurrent virtual users.
+# Run from src/ as: python -m benchmarks.loadgen --users 20 --duration 60
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "feed=45,article=25,chat=10,profile=10,signin=5,ingest=5"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class Recorder:
+    """Collects latencies and failures per endpoint label from all virtual users."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def record(self, label, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def summary(self, duration):
+        rows = {}
+        with self.lock:
+            for label, values in self.latencies.items():
+                ordered = sorted(values)
+                rows[label] = {
+                    "requests": len(ordered),
+                    "errors": self.errors.get(label, 0),
+                    "throughput_rps": round(len(ordered) / duration, 2),
+                    "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                    "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                    "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                    "max_ms": round(ordered[-1] * 1000, 2),
+                }
+        return rows
+
+def use_data_dir(data_dir):
+    """Points the scraper's store (index, bodies, archive, change sequence) at data_dir and returns utils.scraper."""
+    from utils import scraper, changes, bodies, archive
+    scraper.OUTPUT_FILE = os.path.join(data_dir, os.path.basename(scraper.OUTPUT_FILE))
+    bodies.BODY_FILE = os.path.join(data_dir, os.path.basename(bodies.BODY_FILE))
+    archive.ARCHIVE_DIR = os.path.join(data_dir, os.path.basename(archive.ARCHIVE_DIR))
+    archive.SEEN_FILE = os.path.join(data_dir, os.path.basename(archive.SEEN_FILE))
+    changes.SEQUENCE_FILE = os.path.join(data_dir, os.path.basename(changes.SEQUENCE_FILE))
+    return scraper
+
+class Ingestor:
+    """
+    Simulates scraper ingest bursts by storing synthetic articles through the
+    same scraper functions the ingest worker uses (tagging and notification
+    are skipped; they run in the worker, not the web tier under test).
+    """
+
+    def __init__(self, data_dir, burst_size):
+        self.data_dir = data_dir
+        self.burst_size = burst_size
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.scraper = None
+        self.articles = None
+
+    def _load(self):
+        scraper = use_data_dir(self.data_dir)
+        self.scraper = scraper
+        self.articles = scraper.load_existing_data()
+
+    def burst(self):
+        with self.lock:
+            if self.scraper is None:
+                self._load()
+            # The scraper narrates every article on stdout; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                for article in corpus.make_articles(self.burst_size, seed=random.randrange(1 << 30)):
+                    self.counter += 1
+                    article["url"] = f"https://loadtest.local/ingest/{os.getpid()}-{self.counter}.html"
+                    article["scraped_at"] = datetime.now().isoformat()
+                    self.scraper.process_new_article(article, self.articles, notify=lambda a: None)
+
+class VirtualUser(threading.Thread):
+    def __init__(self, index, options, recorder, mailbox, ingestor, stop_at):
+        super().__init__(daemon=True)
+        self.index = index
+        self.options = options
+        self.recorder = recorder
+        self.mailbox = mailbox
+        self.ingestor = ingestor
+        self.stop_at = stop_at
+        self.email = f"vu{index}@loadtest.local"
+        self.session = requests.Session()
+        self.token = None
+        self.articles = []
+        self.actions, self.weights = zip(*options.mix.items())
+
+    def call(self, label, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.options.target + path, timeout=self.options.timeout, **kwargs)
+            ok = response.status_code < 400
+            body = response.content
+            if response.status_code == 401:
+                # Same as the frontend: a rejected token sends the user back to sign-in
+                self.token = None
+        except requests.RequestException:
+            response, ok, body = None, False, b""
+        self.recorder.record(label, time.perf_counter() - started, ok)
+        return response, body
+
+    @property
+    def auth(self):
+        return {"Authorization": f"Bearer {self.token}"}
+
+    # --- Actions ---
+
+    def signin(self):
+        previous = self.mailbox.messages.get(self.email)
+        response, _ = self.call("POST /api/login", "POST", "/api/login", json={"email": self.email})
+        if not response or not response.ok:
+            return
+        code = self.mailbox.wait_for_otp(self.email, after=previous)
+        if not code:
+            self.recorder.record("otp email", self.options.timeout, False)
+            return
+        response, body = self.call("POST /api/verify", "POST", "/api/verify", json={"email": self.email, "otp": code})
+        if response is not None and response.ok:
+            self.token = json.loads(body)["token"]
+
+    def fetch_articles(self, label):
+        response, body = self.call(label, "GET", "/api/articles", headers=self.auth)
+        if response is not None and response.ok:
+            self.articles = json.loads(body)
+
+    def feed(self):
+        self.call("GET /feed.html", "GET", "/feed.html")
+        self.fetch_articles("GET /api/articles (feed)")
+
+    def sync(self):
+        # Incremental refresh of an open feed (opt-in: --mix ...,sync=N)
+        if not self.articles:
+            self.fetch_articles("GET /api/articles (feed)")
+            return
+        cursor = max(a.get("seq", 0) for a in self.articles)
+        response, body = self.call("GET /api/articles?since", "GET", f"/api/articles?since={cursor}", headers=self.auth)
+        if response is not None and response.ok:
+            delta = json.loads(body)
+            self.articles = delta["articles"] + self.articles
+
+    def article(self):
+        self.call("GET /article.html", "GET", "/article.html")
+        # The article page loads the list, picks one client-side, then fetches its body
+        self.fetch_articles("GET /api/articles (article)")
+        if self.articles:
+            article = random.choice(self.articles)
+            self.call("GET /api/articles/<id>", "GET", f"/api/articles/{article.get('id')}", headers=self.auth)
+
+    def chat(self):
+        if not self.articles:
+            self.fetch_articles("GET /api/articles (feed)")
+        if not self.articles:
+            return
+        article = random.choice(self.articles)
+        self.call("POST /api/chat", "POST", "/api/chat", headers=self.auth, json={
+            "query": "What is the main takeaway?",
+            "article_id": article.get("id")
+        })
+
+    def profile(self):
+        self.call("GET /api/user/profile", "GET", "/api/user/profile", headers=self.auth)
+        self.call("POST /api/user/profile", "POST", "/api/user/profile", headers=self.auth, json={
+            "tags": random.sample(corpus.TAGS, 3),
+            "interests_prompt": "security news and cloud infrastructure"
+        })
+
+    def ingest(self):
+        if not self.ingestor:
+            return
+        started = time.perf_counter()
+        try:
+            self.ingestor.burst()
+            ok = True
+        except Exception:
+            ok = False
+        self.recorder.record(f"ingest burst ({self.ingestor.burst_size} articles)", time.perf_counter() - started, ok)
+
+    def run(self):
+        # Stagger start-up so sign-ins don't all land in the same instant
+        time.sleep(random.uniform(0, self.options.ramp_up))
+        self.signin()
+        while time.monotonic() < self.stop_at:
+            if not self.token:
+                self.signin()
+            else:
+                action = random.choices(self.actions, self.weights)[0]
+                getattr(self, action)()
+            time.sleep(random.expovariate(1000 / self.options.think_ms) if self.options.think_ms else 0)
+
+def parse_mix(text):
+    mix = {}
+    for entry in text.split(","):
+        name, _, weight = entry.partition("=")
+        name = name.strip()
+        if name not in ("feed", "sync", "article", "chat", "profile", "signin", "ingest"):
+            raise argparse.ArgumentTypeError(f"Unknown action '{name}'")
+        mix[name] = float(weight or 1)
+    return mix
+
+def spawn_server(options, data_dir, gemini_port, smtp_port):
+    """Starts main.py from src/ with all external services pointed at the local fakes."""
+    port = free_port()
+    corpus.write_json(os.path.join(data_dir, "users.json"), [])
+    # Stored the way the scraper stores them: index plus compressed bodies
+    use_data_dir(data_dir).save_data(corpus.make_articles(options.articles, paragraphs=options.paragraphs))
+
+    env = dict(os.environ,
+               PORT=str(port),
+               USERS_FILE=os.path.join(data_dir, "users.json"),
+               SCRAPER_IN_PROCESS="false",
+               GEMINI_API_KEY="loadtest",
+               GEMINI_API_ENDPOINT=f"http://127.0.0.1:{gemini_port}",
+               SMTP_SERVER="127.0.0.1",
+               SMTP_PORT=str(smtp_port),
+               SMTP_SECURITY="none",
+               SMTP_EMAIL="sheepai@loadtest.local",
+               SMTP_PASSWORD="loadtest")
+    log = open(os.path.join(data_dir, "server.log"), "w")
+    process = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, "main.py")],
+                               cwd=data_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    target = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"main.py exited early; see {log.name}")
+        try:
+            requests.get(target + "/landing.html", timeout=1)
+            return process, target
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("main.py did not start within 30s")
+
+def print_report(rows, duration):
+    print(f"\n{'endpoint':<38} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label in sorted(rows):
+        r = rows[label]
+        print(f"{label:<38} {r['requests']:>7} {r['errors']:>5} {r['throughput_rps']:>8.2f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+    total = sum(r["requests"] for r in rows.values())
+    print(f"\n[*] {total} requests in {duration:.1f}s ({total / duration:.1f} req/s)")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="SheepAI end-to-end load generator")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=500, help="Mean pause between actions (0 = none)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Action weights (default {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--articles", type=int, default=1000, help="Synthetic articles in the spawned server's store")
+    parser.add_argument("--paragraphs", type=int, default=4)
+    parser.add_argument("--burst-size", type=int, default=5, help="Articles per ingest burst")
+    parser.add_argument("--gemini-latency-ms", type=float, default=800)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=300)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.02)
+    parser.add_argument("--gemini-failing-models", default="", help="Comma-separated models that always fail")
+    parser.add_argument("--target", help="Use an already running server instead of spawning main.py")
+    parser.add_argument("--data-dir", help="With --target: the server's data directory (enables ingest bursts)")
+    parser.add_argument("--smtp-port", type=int, default=0, help="With --target: port for the SMTP sink")
+    parser.add_argument("--gemini-port", type=int, default=0, help="With --target: port for the fake Gemini server")
+    parser.add_argument("--json", help="Also write the report to this file")
+    options = parser.parse_args()
+
+    gemini_server, gemini = fake_gemini.start(options.gemini_port, fake_gemini.FakeGeminiConfig(
+        options.gemini_latency_ms, options.gemini_jitter_ms, options.gemini_error_rate,
+        [m for m in options.gemini_failing_models.split(",") if m]))
+    smtp_server, mailbox = smtp_sink.start(options.smtp_port)
+    gemini_port, smtp_port = gemini_server.server_port, smtp_server.server_address[1]
+
+    process, scratch = None, None
+    if options.target:
+        data_dir = options.data_dir
+        print(f"[*] Fake Gemini on :{gemini_port}, SMTP sink on :{smtp_port}.")
+        print("    Start the server with GEMINI_API_ENDPOINT, SMTP_SERVER/SMTP_PORT and SMTP_SECURITY=none pointing here.")
+    else:
+        scratch = data_dir = tempfile.mkdtemp(prefix="sheepai-load-")
+        process, options.target = spawn_server(options, data_dir, gemini_port, smtp_port)
+        print(f"[*] Spawned main.py at {options.target} (data in {data_dir})")
+
+    ingestor = Ingestor(data_dir, options.burst_size) if data_dir else None
+    recorder = Recorder()
+    started = time.monotonic()
+    stop_at = started + options.ramp_up + options.duration
+
+    print(f"[*] Running {options.users} virtual users for {options.duration:.0f}s...")
+    workers = [VirtualUser(i, options, recorder, mailbox, ingestor, stop_at) for i in range(options.users)]
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("\n[!] Interrupted, reporting partial results.")
+    finally:
+        elapsed = time.monotonic() - started
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        gemini_server.shutdown()
+        smtp_server.shutdown()
+
+    rows = recorder.summary(elapsed)
+    print_report(rows, elapsed)
+    print(f"[*] Fake Gemini: {gemini.calls} calls, {gemini.errors} injected errors. SMTP sink: {mailbox.received} messages.")
+
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump({
+                "meta": {"timestamp": datetime.now().isoformat(), "users": options.users,
+                         "duration": elapsed, "mix": options.mix, "target": options.target},
+                "endpoints": rows
+            }, f, indent=4)
+
+    if scratch:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,232 @@
+import os
+import sys
+import json
+import logging
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from benchmarks import corpus, fakes, startup
+
+# Run from src/ as: python -m benchmarks.run --scales 1k,10k
+# Results are written as JSON to RESULTS_DIR; compare two runs with
+# python -m benchmarks.compare <old.json> <new.json>
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure(fn, setup=None, min_time=0.5, min_iterations=3, max_iterations=2000):
+    """
+    Calls fn repeatedly (running `setup` untimed before each call) until
+    min_time seconds of measured time have accumulated. Returns summary stats in ms.
+    """
+    durations = []
+    while len(durations) < max_iterations:
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+        if len(durations) >= min_iterations and sum(durations) >= min_time:
+            break
+
+    durations.sort()
+    ms = [d * 1000 for d in durations]
+    return {
+        "iterations": len(ms),
+        "min_ms": round(ms[0], 4),
+        "median_ms": round(statistics.median(ms), 4),
+        "mean_ms": round(statistics.fmean(ms), 4),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 4),
+        "max_ms": round(ms[-1], 4),
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def load_app_modules():
+    """Imports the backend with Gemini and SMTP replaced by in-process fakes."""
+    import main
+    from utils import ai, mail, users, scraper, sources
+    fakes.patch_ai(ai)
+    fakes.patch_mail(mail)
+
+    # The login/verify paths log every call; keep the benchmark output readable
+    logging.getLogger().setLevel(logging.WARNING)
+    return main, users, scraper, mail, sources
+
+def bench_scale(label, count, modules, options):
+    """Benchmarks the data-size dependent paths against a synthetic corpus of `count` records."""
+    main, users, scraper, mail, sources = modules
+    results = {}
+
+    def run(name, fn, setup=None):
+        if options.only and options.only not in name:
+            return
+        print(f"[*] [{label}] {name}...", flush=True)
+        results[name] = measure(fn, setup=setup, min_time=options.min_time)
+        print(f"    -> median {results[name]['median_ms']:.3f} ms over {results[name]['iterations']} runs")
+
+    user_list = corpus.make_users(count)
+    corpus.write_json(users.USERS_FILE, user_list)
+    scraper.save_data(corpus.make_articles(count, paragraphs=options.paragraphs))
+
+    # Worst case for the linear scans: the last user in the file
+    target = user_list[-1]
+    token = target["token"]
+
+    run("users.validate_token", lambda: users.validate_token(token))
+    run("users.validate_token.miss", lambda: users.validate_token("not-a-token"))
+    run("users.login", lambda: users.login(target["email"], "http://localhost:8080"))
+
+    state = {}
+    def prepare_otp():
+        users.login(target["email"], "http://localhost:8080")
+        state["otp"] = next(u["otp"] for u in users.load_users() if u["email"] == target["email"])
+    run("users.verify_otp", lambda: users.verify_otp(target["email"], state["otp"]), setup=prepare_otp)
+
+    # verify_otp rotated the token
+    token = next(u["token"] for u in users.load_users() if u["email"] == target["email"])
+    run("users.update_user_profile", lambda: users.update_user_profile(token, ["AI", "Linux"], "benchmarks"))
+
+    client = main.app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def articles_request():
+        response = client.get("/api/articles", headers=headers)
+        assert response.status_code == 200, response.status_code
+        response.get_data()
+
+    def drop_article_cache():
+        main._articles_cache["data"] = None
+
+    run("api.articles.warm", articles_request)
+    run("api.articles.cold", articles_request, setup=drop_article_cache)
+
+    article_id = main.load_articles()[-1]["id"]
+    def article_request():
+        response = client.get(f"/api/articles/{article_id}", headers=headers)
+        assert response.status_code == 200, response.status_code
+        response.get_data()
+
+    run("api.article", article_request)
+
+    articles = scraper.load_existing_data()
+    run("scraper.load_existing_data", scraper.load_existing_data)
+    run("scraper.save_data", lambda: scraper.save_data(articles))
+
+    return results
+
+def bench_fixtures(modules, options):
+    """Benchmarks the size-independent paths: HTML parsing and template rendering."""
+    from bs4 import BeautifulSoup
+    main, users, scraper, mail, sources = modules
+    results = {}
+
+    def run(name, fn):
+        if options.only and options.only not in name:
+            return
+        print(f"[*] [fixtures] {name}...", flush=True)
+        results[name] = measure(fn, min_time=options.min_time)
+        print(f"    -> median {results[name]['median_ms']:.3f} ms over {results[name]['iterations']} runs")
+
+    listing_html, article_html = corpus.make_thn_listing(), corpus.make_thn_article()
+    if options.fixtures:
+        # Real saved pages: <dir>/listing.html and <dir>/article.html
+        with open(os.path.join(options.fixtures, "listing.html"), encoding="utf-8") as f:
+            listing_html = f.read()
+        with open(os.path.join(options.fixtures, "article.html"), encoding="utf-8") as f:
+            article_html = f.read()
+
+    thn = sources.HackerNewsSource()
+    run("parse.thn_listing", lambda: thn.discover(BeautifulSoup(listing_html, "html.parser")))
+    run("parse.thn_article", lambda: thn.extract_body(BeautifulSoup(article_html, "html.parser")))
+
+    notification = {"article_title": "Title", "article_summary": "Summary " * 40, "article_url": "http://localhost/a"}
+    run("mail.render_template.notification",
+        lambda: mail.render_template("templates/article_notification.html", notification))
+    run("mail.render_template.otp",
+        lambda: mail.render_template("templates/otp_email.html", {"code": "123456", "link": "http://localhost/v"}))
+
+    return results
+
+def bench_startup(options):
+    """Cold-start cost of the entry points, in fresh interpreters (see benchmarks.startup)."""
+    results = {}
+    for module in ("main", "worker"):
+        name = f"import.{module}"
+        if options.only and options.only not in name:
+            continue
+        print(f"[*] [startup] {name}...", flush=True)
+        report = startup.measure(module, runs=5)
+        results[name] = {"iterations": report["runs"], "min_ms": report["min_ms"], "median_ms": report["median_ms"]}
+        print(f"    -> median {report['median_ms']:.3f} ms over {report['runs']} runs")
+    return results
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="SheepAI backend microbenchmarks")
+    parser.add_argument("--scales", default="1k,10k", help=f"Comma-separated subset of {','.join(corpus.SCALES)}")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds of measured time per benchmark")
+    parser.add_argument("--paragraphs", type=int, default=4, help="Paragraphs per synthetic article body")
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this string")
+    parser.add_argument("--fixtures", help="Directory with saved THN listing.html / article.html")
+    parser.add_argument("--output", help="Result file (default: results/<timestamp>_<commit>.json)")
+    options = parser.parse_args()
+
+    scales = [s.strip() for s in options.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in corpus.SCALES]
+    if unknown:
+        parser.error(f"Unknown scale(s): {', '.join(unknown)}")
+
+    # Work in a scratch directory: the backend reads and writes its data files
+    # relative to the working directory (and users.json next to src/).
+    workdir = tempfile.mkdtemp(prefix="sheepai-bench-")
+    os.chdir(workdir)
+    sys.path.insert(0, SRC_DIR)
+
+    modules = load_app_modules()
+    modules[1].USERS_FILE = os.path.join(workdir, "users.json")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_time": options.min_time,
+            "paragraphs": options.paragraphs,
+        },
+        "results": {}
+    }
+
+    try:
+        report["results"]["startup"] = bench_startup(options)
+        report["results"]["fixtures"] = bench_fixtures(modules, options)
+        for label in scales:
+            report["results"][label] = bench_scale(label, corpus.SCALES[label], modules, options)
+    finally:
+        os.chdir(SRC_DIR)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = options.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"{stamp}_{report['meta']['commit']}.json")
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\n[*] Results written to {output}")
+
+if __name__ == "__main__":
+    main_cli()
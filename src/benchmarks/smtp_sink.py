@@ -0,0 +1,136 @@
+import re
+import time
+import argparse
+import threading
+import socketserver
+from email import message_from_bytes
+
+# Minimal local SMTP server that accepts everything and keeps the last message
+# per recipient. Point the backend at it with SMTP_SERVER=127.0.0.1,
+# SMTP_PORT=<port>, SMTP_SECURITY=none and any SMTP_EMAIL/SMTP_PASSWORD.
+# Run from src/ as: python -m benchmarks.smtp_sink --port 2525
+
+OTP_PATTERN = re.compile(r'class="code">\s*(\d{6})\s*<')
+
+class Mailbox:
+    def __init__(self):
+        self.messages = {}      # recipient -> last message text
+        self.received = 0
+        self.condition = threading.Condition()
+
+    def deliver(self, recipients, raw):
+        message = message_from_bytes(raw)
+        parts = [message] if not message.is_multipart() else list(message.walk())
+        text = ''.join(
+            part.get_payload(decode=True).decode('utf-8', 'replace')
+            for part in parts
+            if not part.is_multipart() and part.get_payload(decode=True)
+        )
+        with self.condition:
+            for recipient in recipients:
+                self.messages[recipient.lower()] = text
+            self.received += 1
+            self.condition.notify_all()
+
+    def wait_for_otp(self, email, timeout=10.0, after=None):
+        """
+        Blocks until an OTP email for `email` arrives and returns the code.
+        Pass `after` (the message text seen before login) to skip stale mail.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while True:
+                text = self.messages.get(email.lower())
+                if text and text != after:
+                    match = OTP_PATTERN.search(text)
+                    if match:
+                        return match.group(1)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+def make_handler(mailbox):
+    class Handler(socketserver.StreamRequestHandler):
+        def reply(self, line):
+            self.wfile.write(line.encode('ascii') + b"\r\n")
+
+        def handle(self):
+            self.reply("220 sheepai-sink ESMTP ready")
+            sender, recipients = None, []
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                command = line.decode('utf-8', 'replace').strip()
+                verb = command.split(' ', 1)[0].upper()
+
+                if verb == "EHLO":
+                    self.wfile.write(b"250-sheepai-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                elif verb == "HELO":
+                    self.reply("250 sheepai-sink")
+                elif verb == "AUTH":
+                    args = command.split()
+                    if len(args) >= 2 and args[1].upper() == "LOGIN":
+                        # Username and password prompts; the values are ignored
+                        if len(args) == 2:
+                            self.reply("334 VXNlcm5hbWU6")
+                            self.rfile.readline()
+                        self.reply("334 UGFzc3dvcmQ6")
+                        self.rfile.readline()
+                    self.reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    sender, recipients = command, []
+                    self.reply("250 OK")
+                elif verb == "RCPT":
+                    recipients.append(command.split(':', 1)[1].strip().strip('<>'))
+                    self.reply("250 OK")
+                elif verb == "DATA":
+                    self.reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = self.rfile.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        if data_line.startswith(b".."):
+                            data_line = data_line[1:]
+                        lines.append(data_line)
+                    mailbox.deliver(recipients, b"".join(lines))
+                    self.reply("250 OK queued")
+                elif verb in ("RSET", "NOOP"):
+                    self.reply("250 OK")
+                elif verb == "QUIT":
+                    self.reply("221 Bye")
+                    return
+                else:
+                    self.reply("502 Command not implemented")
+
+    return Handler
+
+class _Server(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def start(port=0, mailbox=None):
+    """Starts the sink on a daemon thread. Returns (server, mailbox)."""
+    mailbox = mailbox or Mailbox()
+    server = _Server(('127.0.0.1', port), make_handler(mailbox))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, mailbox
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Local SMTP sink")
+    parser.add_argument("--port", type=int, default=2525)
+    options = parser.parse_args()
+
+    server, mailbox = start(options.port)
+    print(f"[*] SMTP sink listening on 127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[*] {mailbox.received} message(s) received")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,78 @@
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Cold-start report: how long `import main` takes in a fresh interpreter and
+# which imports account for it (from python -X importtime).
+# Run from src/ as: python -m benchmarks.startup [--module worker] [--runs 5]
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def import_profile(module="main"):
+    """
+    Imports `module` in a fresh interpreter with -X importtime.
+    Returns {imported name: (self_us, cumulative_us)} for top-level entries and nested ones alike.
+    """
+    # No API key, like a fresh checkout: importing must not need one
+    env = {k: v for k, v in os.environ.items() if k != "GEMINI_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nesting is shown by indentation; keep the innermost name
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+def measure(module="main", runs=5):
+    """
+    Imports `module` `runs` times and returns the median total import time (ms)
+    plus the per-module breakdown from the median run.
+    """
+    profiles = []
+    for _ in range(runs):
+        timings = import_profile(module)
+        profiles.append((timings.get(module, (0, 0))[1], timings))
+
+    profiles.sort(key=lambda p: p[0])
+    total_us, timings = profiles[len(profiles) // 2]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(p[0] for p in profiles) / 1000, 2),
+        "min_ms": round(profiles[0][0] / 1000, 2),
+        "modules": {name: {"self_ms": round(s / 1000, 3), "cumulative_ms": round(c / 1000, 3)}
+                    for name, (s, c) in timings.items()},
+    }
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Import-time breakdown for backend entry points")
+    parser.add_argument("--module", default="main", help="Module to import (main, worker, utils.ai, ...)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="Rows to show, by cumulative time")
+    parser.add_argument("--json", help="Also write the full report to this file")
+    options = parser.parse_args()
+
+    report = measure(options.module, options.runs)
+    print(f"[*] import {report['module']}: median {report['median_ms']:.1f} ms (min {report['min_ms']:.1f} ms, {report['runs']} runs)\n")
+    print(f"{'module':<50} {'self ms':>10} {'cumulative ms':>14}")
+    rows = sorted(report["modules"].items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)
+    for name, row in rows[:options.top]:
+        print(f"{name:<50} {row['self_ms']:>10.2f} {row['cumulative_ms']:>14.2f}")
+
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,11 +1,23 @@
 import threading
 import logging
 import os
-import json
-from flask import Flask, send_from_directory, request, jsonify, redirect
+import time
+import hashlib
+import mimetypes
+from flask import Flask, send_from_directory, send_file, request, jsonify, redirect, g, Response, abort
+from werkzeug.security import safe_join
 from dotenv import load_dotenv
 from utils import scraper
 from utils import users
+from utils import changes
+from utils import metrics
+from utils import profiling
+from utils import assets
+from utils import serialization
+from utils import thumbnails
+from utils import bodies
+from utils import events
+from utils import archive
 
 # Load environment variables
 load_dotenv()
@@ -20,6 +32,162 @@ logging.basicConfig(
 # Initialize Flask App
 # static_folder='www' tells Flask to look for files in src/www
 app = Flask(__name__, static_folder='www')
+serialization.install_json_provider(app)
+
+# Set to "false" when the scraper runs as a separate process (python worker.py),
+# e.g. when serving with several web workers.
+SCRAPER_IN_PROCESS = os.getenv("SCRAPER_IN_PROCESS", "true").lower() == "true"
+
+PORT = int(os.getenv("PORT", 8080))
+
+ARTICLES_FILE = "hacker_news_articles.json"
+
+REQUEST_SECONDS = metrics.Histogram(
+    "sheepai_http_request_seconds", "Flask request latency by route.", ("route", "method", "status"))
+ARTICLES_LOAD_SECONDS = metrics.Histogram(
+    "sheepai_articles_load_seconds", "Time to read and parse the articles file on a cache miss.")
+
+# Parsed article list plus its encoded response bytes, refreshed whenever
+# the ingest worker publishes a change. "body"/"gzip" are built on first use.
+_articles_cache = {"sequence": None, "data": None, "by_id": {}, "cursor": 0, "body": None, "gzip": None, "etag": None}
+_articles_lock = threading.Lock()
+
+def _refresh_articles():
+    """Reloads the cache if the change sequence moved on. Call with _articles_lock held."""
+    sequence = changes.current_sequence()
+    if _articles_cache["data"] is not None and _articles_cache["sequence"] == sequence:
+        metrics.CACHE_REQUESTS.inc(cache="articles", result="hit")
+        return
+
+    metrics.CACHE_REQUESTS.inc(cache="articles", result="miss")
+    with ARTICLES_LOAD_SECONDS.time():
+        if not os.path.exists(ARTICLES_FILE):
+            data = []
+        else:
+            with profiling.span("articles_read"):
+                with open(ARTICLES_FILE, 'rb') as f:
+                    raw = f.read()
+            with profiling.span("articles_parse"):
+                data = serialization.loads(raw)
+
+    # Articles stored before ids existed get theirs derived from the URL
+    by_id = {}
+    for article in data:
+        article_id = article.setdefault("id", scraper.article_id(article['url']))
+        by_id[article_id] = article
+
+    # Highest ingest sequence number: the cursor for /api/articles?since=
+    cursor = max((article.get('seq', 0) for article in data), default=0)
+
+    _articles_cache.update(sequence=sequence, data=data, by_id=by_id, cursor=cursor, body=None, gzip=None, etag=None)
+
+def load_articles():
+    """
+    Returns the article list, re-reading the JSON file only when the
+    change sequence published by the scraper has moved on.
+    """
+    with _articles_lock:
+        _refresh_articles()
+        return _articles_cache["data"]
+
+def find_article(article_id: str):
+    """Returns the article with this id (hot index first, then the archive), or None."""
+    with _articles_lock:
+        _refresh_articles()
+        article = _articles_cache["by_id"].get(article_id)
+    if article is None:
+        with profiling.span("archive"):
+            article = archive.find(article_id)
+    return article
+
+def load_articles_since(since: int):
+    """
+    Returns (articles ingested after `since`, newest first; current cursor).
+    Articles stored before sequence numbers existed are never part of a delta.
+    """
+    with _articles_lock:
+        _refresh_articles()
+        newer = []
+        # The list is newest first, so stop at the first one the client already has
+        for article in _articles_cache["data"]:
+            if article.get('seq', 0) <= since:
+                break
+            newer.append(article)
+        return newer, _articles_cache["cursor"]
+
+# /api/stream clients also get articles stored by a standalone worker
+events.watch_store(load_articles_since)
+
+def load_articles_payload(use_gzip: bool):
+    """
+    Returns (body bytes, etag) for the full article list, encoding (and
+    gzipping) once per store change instead of on every request.
+    """
+    with _articles_lock:
+        _refresh_articles()
+        if _articles_cache["body"] is None:
+            with profiling.span("serialize"):
+                body = serialization.dumps(_articles_cache["data"])
+            _articles_cache["body"] = body
+            _articles_cache["etag"] = hashlib.sha1(body).hexdigest()[:20]
+
+        if not use_gzip:
+            return _articles_cache["body"], _articles_cache["etag"]
+
+        if _articles_cache["gzip"] is None:
+            with profiling.span("compress"):
+                _articles_cache["gzip"] = serialization.compress(_articles_cache["body"])
+        return _articles_cache["gzip"], _articles_cache["etag"] + "-gz"
+
+# --- Instrumentation ---
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    profiling.begin_request()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # Label by route pattern, not raw path, to keep the series count bounded
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            route=route, method=request.method, status=response.status_code
+        )
+
+        # Per-phase breakdown, visible in the browser's network timing panel
+        spans, total = profiling.end_request(f"{request.method} {route}")
+        response.headers['Server-Timing'] = profiling.server_timing_header(spans, total)
+    return response
+
+@app.teardown_request
+def stop_request_profiling(error=None):
+    """Ends profiling for requests that never reached after_request (e.g. a view raised)."""
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    # A no-op when record_request_metrics already ended the request
+    profiling.end_request(f"{request.method} {route}")
+
+@app.after_request
+def compress_json(response):
+    """Gzips sizeable JSON responses for clients that accept it."""
+    if (response.mimetype == 'application/json'
+            and response.status_code == 200
+            and not response.direct_passthrough
+            and 'Content-Encoding' not in response.headers):
+        response.headers['Vary'] = 'Accept-Encoding'
+        if serialization.accepts_gzip(request.headers.get('Accept-Encoding')):
+            data = response.get_data()
+            if len(data) >= serialization.GZIP_MIN_BYTES:
+                response.set_data(serialization.compress(data))
+                response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def serve_metrics():
+    """Prometheus text exposition of all in-process metrics."""
+    return Response(metrics.render(), mimetype=None, content_type=metrics.CONTENT_TYPE)
 
 # --- API Endpoints ---
 
@@ -90,7 +258,12 @@ def api_verify_link():
 @app.route('/api/articles', methods=['GET'])
 def api_articles():
     """
-    Returns the scraped articles from the JSON file.
+    Returns the scraped articles from the JSON file: index entries of the hot
+    window only (full content comes from /api/articles/<id>, older articles
+    from /api/articles/search).
+    With ?since=<cursor>: { "cursor": N, "articles": [...], "reset": bool } holding only
+    articles ingested after the cursor (each article's "seq"; start from the highest one
+    in a full load). "reset" means the cursor is unknown here and the client should reload.
     Requires Authorization header with Bearer token.
     """
     auth_header = request.headers.get('Authorization')
@@ -103,23 +276,159 @@ def api_articles():
     if not user:
         return jsonify({"error": "Unauthorized: Invalid token"}), 401
 
-    file_path = "hacker_news_articles.json"
-    if not os.path.exists(file_path):
-        return jsonify([]), 200
-        
+    since = request.args.get('since', type=int)
+    if since is not None:
+        try:
+            newer, cursor = load_articles_since(since)
+        except Exception as e:
+            logging.error(f"Error reading articles: {e}")
+            return jsonify({"error": "Failed to fetch articles"}), 500
+        # A cursor from the future means the store was replaced
+        return jsonify({"cursor": cursor, "articles": newer, "reset": since > cursor}), 200
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return jsonify(data), 200
+        use_gzip = serialization.accepts_gzip(request.headers.get('Accept-Encoding'))
+        body, etag = load_articles_payload(use_gzip)
+        if request.if_none_match.contains(etag):
+            return Response(status=304, headers={'ETag': f'"{etag}"', 'Vary': 'Accept-Encoding'})
+
+        response = Response(body, status=200, mimetype='application/json')
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Per-user data behind auth: browsers may revalidate, shared caches must not store it
+        response.headers['Cache-Control'] = 'private, no-cache'
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
     except Exception as e:
         logging.error(f"Error reading articles: {e}")
         return jsonify({"error": "Failed to fetch articles"}), 500
 
+@app.route('/api/articles/search', methods=['GET'])
+def api_articles_search():
+    """
+    Searches all articles, including archived ones, newest first.
+    Query: ?q=<words> (all must appear in title, description or tags) or ?url=<article url>,
+    plus optional &limit= (default 50, max 200).
+    Requires Authorization header with Bearer token.
+    """
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"error": "Unauthorized: Missing or invalid token"}), 401
+
+    token = auth_header.split(' ')[1]
+    user = users.validate_token(token)
+
+    if not user:
+        return jsonify({"error": "Unauthorized: Invalid token"}), 401
+
+    url = request.args.get('url')
+    if url:
+        article = find_article(scraper.article_id(url))
+        return jsonify([article] if article else []), 200
+
+    terms = request.args.get('q', '').lower().split()
+    if not terms:
+        return jsonify({"error": "Query is required"}), 400
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+
+    found = [article for article in load_articles() if archive.matches(article, terms)][:limit]
+    if len(found) < limit:
+        with profiling.span("archive"):
+            found += archive.search(terms, limit - len(found))
+    return jsonify(found), 200
+
+@app.route('/api/stream', methods=['GET'])
+def api_stream():
+    """
+    Server-Sent Events stream of newly stored articles ("article" events, one
+    index entry each, with the article's seq as the event id).
+    Resumes after Last-Event-ID on reconnect, or after ?since=<cursor> on first connect.
+    Token via Authorization header or ?token= (EventSource can't set headers).
+    """
+    auth_header = request.headers.get('Authorization')
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(' ')[1]
+    else:
+        token = request.args.get('token')
+
+    user = users.validate_token(token)
+    if not user:
+        return jsonify({"error": "Unauthorized"}), 401
+
+    since = request.headers.get('Last-Event-ID', request.args.get('since'))
+    try:
+        since = int(since) if since is not None else None
+    except ValueError:
+        since = None
+
+    # Subscribe before reading the backlog so nothing stored in between is missed
+    subscription = events.subscribe()
+    if subscription is None:
+        return jsonify({"error": "Too many stream clients"}), 503
+
+    try:
+        backlog = load_articles_since(since)[0] if since is not None else []
+    except Exception:
+        events.unsubscribe(subscription)
+        raise
+    subscription.last_seq = since if since is not None else 0
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            for entry in reversed(backlog):
+                subscription.last_seq = entry.get('seq', 0)
+                yield events.format_event(entry)
+            while not subscription.dropped:
+                entry = subscription.get(timeout=events.HEARTBEAT_SECONDS)
+                yield events.format_event(entry) if entry else ": keep-alive\n\n"
+        finally:
+            events.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Don't let a reverse proxy buffer the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/articles/<article_id>', methods=['GET'])
+def api_article(article_id):
+    """
+    Returns one article including its full content, decompressed on demand.
+    Requires Authorization header with Bearer token.
+    """
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"error": "Unauthorized: Missing or invalid token"}), 401
+
+    token = auth_header.split(' ')[1]
+    user = users.validate_token(token)
+
+    if not user:
+        return jsonify({"error": "Unauthorized: Invalid token"}), 401
+
+    entry = find_article(article_id)
+    if not entry:
+        return jsonify({"error": "Article not found"}), 404
+
+    try:
+        with profiling.span("body"):
+            article = bodies.attach(entry)
+    except Exception as e:
+        logging.error(f"Error reading body of article {article_id}: {e}")
+        return jsonify({"error": "Failed to fetch article"}), 500
+
+    return jsonify(article), 200
+
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     """
     Endpoint for article chatbot.
-    Expects JSON: { "query": "...", "article_title": "...", "article_content": "..." }
+    Expects JSON: { "query": "...", "article_id": "...", "reset": false }
+    (or "article_title" and "article_content" for text that isn't in the store).
+    Questions about a stored article continue the user's conversation about it
+    (utils/chat.py) unless "reset" is true; raw content is answered statelessly.
     Requires Authentication.
     """
     auth_header = request.headers.get('Authorization')
@@ -137,11 +446,24 @@ def api_chat():
     article_title = data.get('article_title')
     article_content = data.get('article_content')
 
+    if data.get('article_id'):
+        entry = find_article(data['article_id'])
+        if not entry:
+            return jsonify({"error": "Article not found"}), 404
+        article_title = entry.get('title')
+        with profiling.span("body"):
+            article_content = bodies.content(entry)
+
     if not query or not article_content:
         return jsonify({"error": "Query and content are required"}), 400
 
-    from utils import ai
-    response = ai.chat_with_article(query, article_title, article_content)
+    from utils import ai, chat
+    with profiling.span("model"):
+        if data.get('article_id'):
+            response = chat.ask(user.get('email'), data['article_id'], query, article_title, article_content,
+                                reset=bool(data.get('reset')))
+        else:
+            response = ai.chat_with_article(query, article_title, article_content)
 
     return jsonify({"response": response}), 200
 
@@ -213,24 +535,96 @@ def api_extract_tags():
         logging.error(f"AI tag extraction failed: {e}")
         return jsonify({"error": "Extraction failed"}), 500
 
+@app.route('/thumb/<article_id>', methods=['GET'])
+def api_thumbnail(article_id):
+    """
+    Serves a locally stored, resized thumbnail for an article.
+    Query: ?w=<width> (snapped to the nearest stored size).
+    No auth: <img> tags can't send the bearer token, and thumbnails aren't private.
+    """
+    width = request.args.get('w', thumbnails.DEFAULT_WIDTH, type=int)
+    accept = request.headers.get('Accept')
+
+    found = thumbnails.lookup(article_id, width, accept)
+    if found:
+        thumbnails.THUMB_REQUESTS.inc(result="hit")
+    else:
+        # Not stored yet (older article, or evicted): fetch it once now
+        article = find_article(article_id)
+        if not article:
+            abort(404)
+        with profiling.span("thumb_fetch"):
+            thumbnails.store(article_id, article.get('thumbnail'))
+        found = thumbnails.lookup(article_id, width, accept)
+        if not found:
+            thumbnails.THUMB_REQUESTS.inc(result="missing")
+            if str(article.get('thumbnail', '')).startswith(('http://', 'https://')):
+                return redirect(article['thumbnail'])
+            abort(404)
+        thumbnails.THUMB_REQUESTS.inc(result="fetched")
+
+    path, mimetype = found
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=True)
+    # An article's image never changes, so browsers can keep it for good
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept'
+    return response
+
 # --- Static File Serving ---
 
+# Fingerprinted, precompressed build of www/ (python -m utils.assets).
+# Without a build, files are served from www/ as-is.
+ASSET_MANIFEST = assets.load_manifest()
+FINGERPRINTED_ASSETS = set(ASSET_MANIFEST.values()) if ASSET_MANIFEST else set()
+
+if ASSET_MANIFEST is None:
+    logging.info("No asset build found; serving www/ uncompressed. Run: python -m utils.assets")
+
+def send_asset(path):
+    """
+    Serves a static file, preferring the precompressed build.
+    Content-hashed files are cached forever; everything else revalidates via ETag.
+    """
+    if ASSET_MANIFEST is None:
+        return send_from_directory(app.static_folder, path)
+
+    # Old-style references (e.g. "style.css") still work, just without long-lived caching
+    name = ASSET_MANIFEST.get(path, path)
+    file_path = safe_join(assets.BUILD_DIR, name)
+    if not file_path or not os.path.isfile(file_path) or name == assets.MANIFEST_NAME:
+        abort(404)
+
+    send_path, encoding = assets.negotiate(file_path, request.headers.get('Accept-Encoding'))
+    mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    response = send_file(
+        send_path, mimetype=mimetype, download_name=os.path.basename(name), conditional=True, etag=True
+    )
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if name in FINGERPRINTED_ASSETS and name == path:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/verify.html')
 def serve_verify_page():
     """
     Special handler for verify.html.
     """
-    return send_from_directory(app.static_folder, 'verify.html')
+    return send_asset('verify.html')
 
 @app.route('/')
 def serve_index():
     """Serves the index.html file."""
-    return send_from_directory(app.static_folder, 'index.html')
+    return send_asset('index.html')
 
 @app.route('/<path:path>')
 def serve_static(path):
     """Serves any other file from the www directory (css, js, images)."""
-    return send_from_directory(app.static_folder, path)
+    return send_asset(path)
 
 # --- Main Entry Point ---
 
@@ -239,11 +633,20 @@ if __name__ == "__main__":
 
     # 1. Start the Scraper in a background thread
     # daemon=True ensures the thread closes when the server stops
-    scraper_thread = threading.Thread(target=scraper.monitor_feed, daemon=True)
-    scraper_thread.start()
+    # (skipped when a standalone worker.py handles ingestion)
+    if SCRAPER_IN_PROCESS:
+        # Same lock as worker.py: the article store must have a single writer
+        writer_lock = changes.acquire_writer_lock()
+        if writer_lock:
+            scraper_thread = threading.Thread(target=scraper.monitor_feed, daemon=True)
+            scraper_thread.start()
+        else:
+            logging.warning(f"Another ingest worker holds {changes.LOCK_FILE}; not starting the in-process scraper.")
+    else:
+        logging.info("Scraper disabled in this process; expecting a standalone worker.")
 
     # 2. Start the Flask Web Server
     # host='0.0.0.0' makes it accessible on your local network
-    # port=8080 is the port (http://localhost:8080)
-    logging.info("Server running at http://localhost:8080")
-    app.run(host='0.0.0.0', port=8080, debug=True, use_reloader=False)
+    # port=8080 is the port (http://localhost:8080), override with PORT
+    logging.info(f"Server running at http://localhost:{PORT}")
+    app.run(host='0.0.0.0', port=PORT, debug=True, use_reloader=False)
@@ -1,30 +1,56 @@
 import os
 import json
 import logging
-import requests
-from bs4 import BeautifulSoup
+import threading
 from dotenv import load_dotenv
-import google.generativeai as genai
+from utils import sources, metrics
 
-# Load environment variables
-load_dotenv()
+# The Gemini SDK, requests and bs4 are heavy imports that web requests
+# rarely need. They are loaded on first use (see get_genai) so importing this
+# module is cheap and doesn't require GEMINI_API_KEY.
 
 # Configuration
-API_KEY = os.getenv("GEMINI_API_KEY")
+load_dotenv()
 OUTPUT_FILE = os.getenv("OUTPUT_FILE", "data.json")
 
-# Configure Logging (dd/mm/yyyy format)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%d/%m/%Y %H:%M:%S'
-)
+# Configured google.generativeai module, set by get_genai() on first use
+genai = None
+_genai_lock = threading.Lock()
 
-if not API_KEY:
-    logging.error("GEMINI_API_KEY not found in .env file.")
-    exit(1)
+class AIConfigurationError(RuntimeError):
+    """Raised when the Gemini client can't be set up (e.g. missing API key)."""
 
-genai.configure(api_key=API_KEY)
+def get_genai():
+    """
+    Imports and configures the Gemini SDK on first use and returns it.
+    Raises AIConfigurationError if GEMINI_API_KEY is not set or the SDK isn't installed.
+    """
+    global genai
+    if genai is not None:
+        return genai
+
+    with _genai_lock:
+        if genai is None:
+            load_dotenv()
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise AIConfigurationError("GEMINI_API_KEY not found in .env file.")
+
+            try:
+                import google.generativeai as sdk
+            except ImportError as e:
+                raise AIConfigurationError(f"Gemini SDK not available: {e}") from e
+
+            # Optional override, e.g. a local fake Gemini server for load tests
+            # (benchmarks/fake_gemini.py). Uses the REST transport so plain http:// works.
+            api_endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if api_endpoint:
+                sdk.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": api_endpoint})
+            else:
+                sdk.configure(api_key=api_key)
+            genai = sdk
+
+    return genai
 
 # List of models based on your specific access
 MODELS_TO_TRY = [
@@ -35,11 +61,35 @@ MODELS_TO_TRY = [
     "gemini-pro-latest"
 ]
 
+AI_CALL_SECONDS = metrics.Histogram(
+    "sheepai_ai_call_seconds", "Gemini generate_content latency.", ("model", "operation"))
+AI_CALL_ERRORS = metrics.Counter(
+    "sheepai_ai_call_errors_total", "Failed Gemini calls (including unusable responses).", ("model", "operation"))
+AI_FALLBACKS = metrics.Counter(
+    "sheepai_ai_fallbacks_total", "Times a model failed and the next entry in MODELS_TO_TRY was tried.", ("model", "operation"))
+AI_EXHAUSTED = metrics.Counter(
+    "sheepai_ai_all_models_failed_total", "Calls where every model in MODELS_TO_TRY failed.", ("operation",))
+
+def _generate_content(model, model_name: str, prompt: str, operation: str):
+    """Calls the model, recording latency per model and operation."""
+    with AI_CALL_SECONDS.time(model=model_name, operation=operation):
+        return model.generate_content(prompt)
+
+def _record_failure(model_name: str, operation: str):
+    AI_CALL_ERRORS.inc(model=model_name, operation=operation)
+    if model_name != MODELS_TO_TRY[-1]:
+        AI_FALLBACKS.inc(model=model_name, operation=operation)
+    else:
+        AI_EXHAUSTED.inc(operation=operation)
+
 def scrape_article_content(url: str) -> str:
     """
     Visits the URL to extract text content if missing from JSON.
     """
     logging.info(f"Scraping content from: {url}")
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         headers = {
             'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36'
@@ -49,13 +99,8 @@ def scrape_article_content(url: str) -> str:
         
         soup = BeautifulSoup(response.content, 'html.parser')
         
-        # Target common article body tags
-        article_body = soup.find('article') or soup.find('div', class_='content') or soup.find('main')
-        
-        if article_body:
-            text = article_body.get_text(separator='\n', strip=True)
-        else:
-            text = soup.body.get_text(separator='\n', strip=True)
+        # Same generic extractor the ingestion pipeline uses for non-THN sources
+        text = sources.extract_generic_text(soup)
             
         return text[:30000]
             
@@ -81,9 +126,15 @@ def extract_tags_from_user_description(text: str) -> list:
     ["AI", "Machine Learning", "Finance", "Cybersecurity"]
     """
 
+    try:
+        client = get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        return []
+
     for model_name in MODELS_TO_TRY:
         try:
-            model = genai.GenerativeModel(
+            model = client.GenerativeModel(
                 model_name=model_name,
                 generation_config={
                     "response_mime_type": "application/json",
@@ -91,11 +142,12 @@ def extract_tags_from_user_description(text: str) -> list:
                 }
             )
 
-            response = model.generate_content(prompt)
+            response = _generate_content(model, model_name, prompt, "extract_user_tags")
             return json.loads(response.text)
 
         except Exception as e:
             logging.warning(f"Model {model_name} failed during user tag extraction: {e}")
+            _record_failure(model_name, "extract_user_tags")
             continue
     return []
 
@@ -124,9 +176,15 @@ def generate_tags(title: str, content_text: str) -> list:
     ]
     """
 
+    try:
+        client = get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        return []
+
     for model_name in MODELS_TO_TRY:
         try:
-            model = genai.GenerativeModel(
+            model = client.GenerativeModel(
                 model_name=model_name,
                 generation_config={
                     "response_mime_type": "application/json",
@@ -134,7 +192,7 @@ def generate_tags(title: str, content_text: str) -> list:
                 }
             )
             
-            response = model.generate_content(prompt)
+            response = _generate_content(model, model_name, prompt, "generate_tags")
             
             if not response.text:
                 raise ValueError("Empty response received")
@@ -145,21 +203,34 @@ def generate_tags(title: str, content_text: str) -> list:
             
         except Exception as e:
             logging.warning(f"Model {model_name} failed: {e}")
+            _record_failure(model_name, "generate_tags")
             continue
             
     logging.error("All available models failed to generate tags.")
     return []
 
-def chat_with_article(query: str, article_title: str, article_content: str) -> str:
+# Reply when no model could answer a chat question
+CHAT_UNAVAILABLE = "I'm having trouble connecting to the AI right now. Please try again later."
+
+def chat_with_article(query: str, article_title: str, article_content: str,
+                      conversation: str = "", excerpts: bool = False) -> str:
     """
     Answers a user query based on the article content.
+    `conversation` is the earlier exchange (summary and recent turns) for follow-ups;
+    with `excerpts`, article_content holds only the passages relevant to the query.
     """
+    content_label = "Relevant Article Excerpts" if excerpts else "Article Content"
+    conversation_block = f"""
+    Conversation So Far:
+    {conversation}
+""" if conversation else ""
+
     prompt = f"""
     You are an AI assistant answering questions about a specific news article.
 
     Article Title: {article_title}
-    Article Content: {article_content[:30000]}
-
+    {content_label}: {article_content[:30000]}
+{conversation_block}
     User Query: {query}
 
     Instructions:
@@ -168,23 +239,75 @@ def chat_with_article(query: str, article_title: str, article_content: str) -> s
     3. Be concise and helpful.
     """
 
+    try:
+        client = get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        return CHAT_UNAVAILABLE
+
     for model_name in MODELS_TO_TRY:
         try:
-            model = genai.GenerativeModel(
+            model = client.GenerativeModel(
                 model_name=model_name,
                 generation_config={
                     "temperature": 0.5,
                 }
             )
 
-            response = model.generate_content(prompt)
+            response = _generate_content(model, model_name, prompt, "chat")
             return response.text.strip()
 
         except Exception as e:
             logging.warning(f"Model {model_name} failed during chat: {e}")
+            _record_failure(model_name, "chat")
             continue
 
-    return "I'm having trouble connecting to the AI right now. Please try again later."
+    return CHAT_UNAVAILABLE
+
+def summarize_chat(previous_summary: str, turns: list) -> str:
+    """
+    Folds (question, answer) turns into the running summary of a chat about an article.
+    Returns the new summary, or None if every model failed.
+    """
+    exchange = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in turns)
+    prompt = f"""
+    Update the running summary of a conversation about a news article.
+
+    Summary So Far: {previous_summary or "(none)"}
+
+    New Exchange:
+    {exchange}
+
+    Instructions:
+    1. Keep what the user asked about and the facts given in the answers.
+    2. Drop pleasantries and repetition.
+    3. At most 120 words, plain text.
+    """
+
+    try:
+        client = get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        return None
+
+    for model_name in MODELS_TO_TRY:
+        try:
+            model = client.GenerativeModel(
+                model_name=model_name,
+                generation_config={
+                    "temperature": 0.2,
+                }
+            )
+
+            response = _generate_content(model, model_name, prompt, "summarize_chat")
+            return response.text.strip()
+
+        except Exception as e:
+            logging.warning(f"Model {model_name} failed during chat summary: {e}")
+            _record_failure(model_name, "summarize_chat")
+            continue
+
+    return None
 
 def analyze_user_interest(article: dict, user: dict) -> str:
     """
@@ -241,16 +364,22 @@ def analyze_user_interest(article: dict, user: dict) -> str:
     Just the summary text or "NOT_INTERESTING".
     """
 
+    try:
+        client = get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        return None
+
     for model_name in MODELS_TO_TRY:
         try:
-            model = genai.GenerativeModel(
+            model = client.GenerativeModel(
                 model_name=model_name,
                 generation_config={
                     "temperature": 0.2,
                 }
             )
 
-            response = model.generate_content(prompt)
+            response = _generate_content(model, model_name, prompt, "analyze_user_interest")
             result = response.text.strip()
 
             if "NOT_INTERESTING" in result:
@@ -260,6 +389,7 @@ def analyze_user_interest(article: dict, user: dict) -> str:
 
         except Exception as e:
             logging.warning(f"Model {model_name} failed during interest analysis: {e}")
+            _record_failure(model_name, "analyze_user_interest")
             continue
 
     return None
@@ -318,6 +448,20 @@ def analyze_article_by_title(target_title: str):
 
 if __name__ == "__main__":
     import sys
+
+    # Configure Logging (dd/mm/yyyy format)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%d/%m/%Y %H:%M:%S'
+    )
+
+    try:
+        get_genai()
+    except AIConfigurationError as e:
+        logging.error(e)
+        sys.exit(1)
+
     if len(sys.argv) > 1:
         title_arg = " ".join(sys.argv[1:]) if len(sys.argv) > 2 else sys.argv[1]
         analyze_article_by_title(title_arg)
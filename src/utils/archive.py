@@ -0,0 +1,225 @@
+import os
+import json
+import gzip
+import array
+import bisect
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+from utils import bodies, metrics
+
+# Retention for the article index: the last HOT_DAYS of articles stay in
+# hacker_news_articles.json (what the feed, notifications and ingest work
+# with), older ones are moved to compressed monthly archive segments that
+# are still reachable by id and through search. Bodies stay where they are
+# in the body file (utils/bodies.py); archived entries keep their reference.
+# Every URL ever stored is remembered in a compact digest file for dedup.
+
+HOT_DAYS = int(os.getenv("RETENTION_HOT_DAYS", 30))
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archive")
+SEEN_FILE = os.getenv("SEEN_URLS_FILE", "hacker_news_articles.urls")
+
+# id -> segment name, plus the highest archived seq
+INDEX_NAME = "index.json"
+SEGMENT_PREFIX = "articles-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+# Decoded segments kept for by-id lookups
+SEGMENT_CACHE_SIZE = 4
+
+ARCHIVED = metrics.Counter(
+    "sheepai_archive_articles_total", "Articles moved from the hot index to the archive.")
+
+_lock = threading.Lock()
+_index_cache = {"mtime_ns": None, "index": None}
+_segment_cache = {}  # (name, mtime_ns) -> {id: entry}
+
+class UrlSet:
+    """
+    Persistent set of stored URLs, kept as sorted 64-bit digests (8 bytes per
+    URL in memory and on disk) instead of the URL strings themselves.
+    New URLs are appended to SEEN_FILE and merged into the sorted array in batches.
+    """
+
+    MERGE_THRESHOLD = 1024
+
+    def __init__(self, path=None):
+        self.path = path or SEEN_FILE
+        self.sorted = array.array('Q')
+        self.recent = set()
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+
+        aligned = len(raw) - len(raw) % self.sorted.itemsize
+        if aligned != len(raw):
+            # Torn last write: drop the partial digest, and cut it from the file
+            # so later appends stay aligned
+            logging.warning(f"{self.path} has a truncated entry; dropping {len(raw) - aligned} byte(s).")
+            os.truncate(self.path, aligned)
+        self.sorted.frombytes(raw[:aligned])
+        self.sorted = array.array('Q', sorted(self.sorted))
+
+    @staticmethod
+    def digest(url: str) -> int:
+        return int.from_bytes(hashlib.sha1(url.encode('utf-8')).digest()[:8], 'little')
+
+    def __contains__(self, url):
+        key = self.digest(url)
+        if key in self.recent:
+            return True
+        i = bisect.bisect_left(self.sorted, key)
+        return i < len(self.sorted) and self.sorted[i] == key
+
+    def __len__(self):
+        return len(self.sorted) + len(self.recent)
+
+    def add_all(self, urls):
+        """Records URLs as stored (persisted before returning)."""
+        keys = [self.digest(url) for url in urls if url not in self]
+        if not keys:
+            return
+        with open(self.path, 'ab') as f:
+            f.write(array.array('Q', keys).tobytes())
+        self.recent.update(keys)
+        if len(self.recent) >= self.MERGE_THRESHOLD:
+            self.sorted = array.array('Q', sorted(list(self.sorted) + list(self.recent)))
+            self.recent.clear()
+
+    def add(self, url):
+        self.add_all([url])
+
+def _parse_date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def is_cold(article, cutoff) -> bool:
+    scraped_at = _parse_date(article.get('scraped_at'))
+    # Undated articles stay hot rather than disappearing from the feed
+    return scraped_at is not None and scraped_at.replace(tzinfo=None) < cutoff
+
+def _segment_name(article):
+    return f"{SEGMENT_PREFIX}{_parse_date(article['scraped_at']).strftime('%Y-%m')}"
+
+def _segment_path(name):
+    return os.path.join(ARCHIVE_DIR, name + SEGMENT_SUFFIX)
+
+def _read_index():
+    try:
+        mtime_ns = os.stat(os.path.join(ARCHIVE_DIR, INDEX_NAME)).st_mtime_ns
+    except OSError:
+        return {"ids": {}, "max_seq": 0}
+    if _index_cache["mtime_ns"] != mtime_ns:
+        with open(os.path.join(ARCHIVE_DIR, INDEX_NAME), 'r', encoding='utf-8') as f:
+            _index_cache.update(mtime_ns=mtime_ns, index=json.load(f))
+    return _index_cache["index"]
+
+def _write_index(index):
+    path = os.path.join(ARCHIVE_DIR, INDEX_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def max_seq() -> int:
+    """Highest ingest sequence number among archived articles."""
+    with _lock:
+        return _read_index().get("max_seq", 0)
+
+def retire(articles, now=None) -> int:
+    """
+    Moves articles older than HOT_DAYS out of `articles` (in place) into the
+    archive and returns how many moved. The caller saves the hot list afterwards;
+    an article archived but not yet removed from the index is not archived twice.
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=HOT_DAYS)
+    cold = [article for article in articles if is_cold(article, cutoff)]
+    if not cold:
+        return 0
+
+    with _lock:
+        index = dict(_read_index())
+        ids = dict(index.get("ids", {}))
+
+        by_segment = {}
+        for article in cold:
+            if article['id'] not in ids:
+                # Stores not saved since bodies were split out still hold content inline
+                entry = bodies.detach(article)
+                by_segment.setdefault(_segment_name(article), []).append(entry)
+
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        for name, entries in by_segment.items():
+            # Each write appends a gzip member; readers see the members as one stream
+            with gzip.open(_segment_path(name), 'ab') as f:
+                for article in entries:
+                    f.write(json.dumps(article, ensure_ascii=False).encode('utf-8') + b"\n")
+            for article in entries:
+                ids[article['id']] = name
+
+        index["ids"] = ids
+        index["max_seq"] = max([index.get("max_seq", 0)] + [a.get('seq', 0) for a in cold])
+        _write_index(index)
+
+    cold_ids = {id(article) for article in cold}
+    articles[:] = [article for article in articles if id(article) not in cold_ids]
+    ARCHIVED.inc(len(cold))
+    return len(cold)
+
+def _load_segment(name):
+    """Returns {id: entry} for a segment, from a small cache keyed by file version."""
+    path = _segment_path(name)
+    key = (name, os.stat(path).st_mtime_ns)
+    if key not in _segment_cache:
+        entries = {}
+        for article in _iter_segment(path):
+            entries[article['id']] = article
+        if len(_segment_cache) >= SEGMENT_CACHE_SIZE:
+            _segment_cache.pop(next(iter(_segment_cache)))
+        _segment_cache[key] = entries
+    return _segment_cache[key]
+
+def _iter_segment(path):
+    with gzip.open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def find(article_id: str):
+    """Returns the archived index entry with this id, or None."""
+    with _lock:
+        name = _read_index().get("ids", {}).get(article_id)
+        if not name:
+            return None
+        try:
+            return _load_segment(name).get(article_id)
+        except OSError as e:
+            logging.error(f"Archive segment {name} unreadable: {e}")
+            return None
+
+def matches(article, terms) -> bool:
+    """True if every term appears in the title, description or tags."""
+    tags = " ".join(t.get('name', '') if isinstance(t, dict) else str(t) for t in article.get('tags', []))
+    text = f"{article.get('title', '')} {article.get('description', '')} {tags}".lower()
+    return all(term in text for term in terms)
+
+def search(terms, limit: int):
+    """Archived entries matching all terms, newest segment first, at most `limit`."""
+    try:
+        names = sorted((n for n in os.listdir(ARCHIVE_DIR) if n.endswith(SEGMENT_SUFFIX)), reverse=True)
+    except FileNotFoundError:
+        return []
+
+    found = []
+    for name in names:
+        # Streamed line by line: searching never holds a whole segment in memory
+        for article in _iter_segment(os.path.join(ARCHIVE_DIR, name)):
+            if matches(article, terms):
+                found.append(article)
+                if len(found) >= limit:
+                    return found
+    return found
@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import gzip
+import shutil
+import hashlib
+import logging
+from utils import serialization
+
+# Static asset build: content-hashed copies of www/ assets, HTML pages
+# rewritten to reference them, and gzip/brotli variants of every text file.
+# Build from src/ with: python -m utils.assets
+# main.py serves from BUILD_DIR when a manifest exists, otherwise from www/.
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "www")
+BUILD_DIR = os.getenv("ASSETS_BUILD_DIR") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "www_dist")
+MANIFEST_NAME = "manifest.json"
+
+# Referenced from pages by name and safe to rename; HTML pages keep their URLs
+FINGERPRINT_EXTENSIONS = {".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".webp", ".ico", ".woff2"}
+COMPRESS_EXTENSIONS = {".html", ".css", ".js", ".svg", ".json", ".txt"}
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def _fingerprinted_name(name, data):
+    stem, ext = os.path.splitext(name)
+    digest = hashlib.sha256(data).hexdigest()[:10]
+    return f"{stem}.{digest}{ext}"
+
+def _rewrite_references(html, renames):
+    """Points src="x.js" / href="style.css" at the fingerprinted names."""
+    def replace(match):
+        attr, quote, target = match.group(1), match.group(2), match.group(3)
+        return f"{attr}={quote}{renames.get(target, target)}{quote}"
+    return re.sub(r'\b(src|href)=(["\'])([^"\'#?]+)\2', replace, html)
+
+def _write_variants(path, data):
+    """Writes .gz (and .br when available) next to `path` if they are smaller."""
+    variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli:
+        variants.append((".br", brotli.compress(data, quality=11)))
+
+    for suffix, compressed in variants:
+        if len(compressed) < len(data):
+            with open(path + suffix, 'wb') as f:
+                f.write(compressed)
+
+def build(source_dir=SOURCE_DIR, build_dir=BUILD_DIR):
+    """
+    Rebuilds build_dir from source_dir and returns the manifest
+    ({original name: fingerprinted name}).
+    """
+    staging = build_dir + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    names = sorted(n for n in os.listdir(source_dir) if os.path.isfile(os.path.join(source_dir, n)))
+    renames = {}
+    outputs = {}
+
+    for name in names:
+        with open(os.path.join(source_dir, name), 'rb') as f:
+            data = f.read()
+        if os.path.splitext(name)[1].lower() in FINGERPRINT_EXTENSIONS:
+            renames[name] = _fingerprinted_name(name, data)
+            outputs[renames[name]] = data
+        else:
+            outputs[name] = data
+
+    for out_name, data in outputs.items():
+        if out_name.endswith(".html"):
+            data = _rewrite_references(data.decode('utf-8'), renames).encode('utf-8')
+        path = os.path.join(staging, out_name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        if os.path.splitext(out_name)[1].lower() in COMPRESS_EXTENSIONS:
+            _write_variants(path, data)
+
+    with open(os.path.join(staging, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(renames, f, indent=4, sort_keys=True)
+
+    # Keep the previous build's fingerprinted files: pages already cached by
+    # browsers (or still being loaded) may reference them
+    previous = load_manifest(build_dir) or {}
+    for old_name in set(previous.values()) - set(renames.values()):
+        for suffix in ("",) + tuple(s for _, s in ENCODINGS):
+            old_path = os.path.join(build_dir, old_name + suffix)
+            if os.path.isfile(old_path):
+                shutil.copy2(old_path, os.path.join(staging, old_name + suffix))
+
+    # Swap in the finished build in one step so a running server never sees a partial one
+    old = build_dir + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(build_dir):
+        os.rename(build_dir, old)
+    os.rename(staging, build_dir)
+    shutil.rmtree(old, ignore_errors=True)
+
+    return renames
+
+def load_manifest(build_dir=BUILD_DIR):
+    """Returns the build manifest, or None if no build exists."""
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, json.JSONDecodeError):
+        return None
+
+def negotiate(file_path, accept_encoding):
+    """
+    Picks the best precompressed variant of file_path the client accepts.
+    Returns (path to send, content encoding or None).
+    """
+    for encoding, suffix in ENCODINGS:
+        if serialization.accepts_encoding(accept_encoding, encoding) and os.path.isfile(file_path + suffix):
+            return file_path + suffix, encoding
+    return file_path, None
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%d/%m/%Y %H:%M:%S'
+    )
+    manifest = build()
+    logging.info(f"Built {len(manifest)} fingerprinted assets into {BUILD_DIR}"
+                 f"{'' if brotli else ' (brotli not installed: gzip only)'}.")
@@ -0,0 +1,106 @@
+import os
+import mmap
+import zlib
+import threading
+from utils import metrics
+
+# Article body storage: full article text lives compressed in an append-only
+# blob file, and the article index (hacker_news_articles.json) only keeps a
+# small {"offset", "length", "codec"} reference to it. Bodies are read back
+# through a memory map and decompressed only when an article is opened or
+# chatted about.
+
+try:
+    import zstandard  # Optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+BODY_FILE = os.getenv("BODIES_FILE", "hacker_news_articles.bodies")
+
+# Fields moved out of the index into the blob file
+BODY_FIELDS = ("content",)
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+BODY_READ_SECONDS = metrics.Histogram(
+    "sheepai_body_read_seconds", "Time to read and decompress one article body.")
+
+_write_lock = threading.Lock()
+_read_lock = threading.Lock()
+# Current read-only mapping of BODY_FILE, replaced when the file grows
+_mapping = {"path": None, "inode": None, "mmap": None}
+
+def _compress(text: str):
+    data = text.encode('utf-8')
+    if zstandard:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return "zlib", zlib.compress(data, ZLIB_LEVEL)
+
+def _decompress(codec: str, blob: bytes) -> str:
+    if codec == "zstd":
+        if not zstandard:
+            raise RuntimeError("Article body is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(blob).decode('utf-8')
+    return zlib.decompress(blob).decode('utf-8')
+
+def append(text: str) -> dict:
+    """Compresses `text` onto the end of the blob file and returns its reference."""
+    codec, blob = _compress(text)
+    with _write_lock:
+        with open(BODY_FILE, 'ab') as f:
+            offset = f.tell()
+            f.write(blob)
+    return {"offset": offset, "length": len(blob), "codec": codec}
+
+def _view(end: int):
+    """Returns a mapping of BODY_FILE covering at least `end` bytes. Call with _read_lock held."""
+    current = _mapping["mmap"]
+    if current is not None and _mapping["path"] == BODY_FILE and len(current) >= end:
+        stat = os.stat(BODY_FILE)
+        if stat.st_ino == _mapping["inode"]:
+            return current
+
+    # The file grew (or was replaced) since it was mapped
+    if current is not None:
+        current.close()
+    _mapping.update(path=None, inode=None, mmap=None)
+    with open(BODY_FILE, 'rb') as f:
+        view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _mapping.update(path=BODY_FILE, inode=os.fstat(f.fileno()).st_ino, mmap=view)
+    if len(view) < end:
+        raise ValueError(f"{BODY_FILE} is shorter than the index expects ({len(view)} < {end} bytes)")
+    return view
+
+def read(ref: dict) -> str:
+    """Returns the decompressed body behind a reference from append()."""
+    with BODY_READ_SECONDS.time():
+        offset, length = ref["offset"], ref["length"]
+        with _read_lock:
+            blob = _view(offset + length)[offset:offset + length]
+        return _decompress(ref.get("codec", "zlib"), blob)
+
+def detach(article: dict) -> dict:
+    """
+    Returns the index entry for `article`: a copy without BODY_FIELDS and with
+    a "body" reference, appending the body to the blob file if it isn't there yet.
+    Entries that are already detached are returned as-is.
+    """
+    if "body" in article or not any(field in article for field in BODY_FIELDS):
+        return article
+    entry = {k: v for k, v in article.items() if k not in BODY_FIELDS}
+    entry["body"] = append(article.get("content") or "")
+    return entry
+
+def attach(entry: dict) -> dict:
+    """Returns a copy of an index entry with its body fields filled back in."""
+    article = dict(entry)
+    ref = article.pop("body", None)
+    if ref is not None:
+        article["content"] = read(ref)
+    return article
+
+def content(entry: dict) -> str:
+    """The article text for an index entry (inline for stores written before bodies were split out)."""
+    if "body" in entry:
+        return read(entry["body"])
+    return entry.get("content", "")
@@ -0,0 +1,70 @@
+import os
+import logging
+
+# Sequence file bumped by the ingest worker each time the article store changes.
+# Web processes compare it against the value they last saw to decide whether
+# their in-memory caches are stale. Path is relative to src/, like OUTPUT_FILE.
+SEQUENCE_FILE = os.getenv("CHANGES_SEQUENCE_FILE", "hacker_news_articles.seq")
+
+# Held by whichever process runs ingestion (worker.py, or main.py's in-process
+# scraper): only one may write the article store and publish changes
+LOCK_FILE = os.getenv("WORKER_LOCK_FILE", "worker.lock")
+
+# Last (mtime_ns, sequence) pair read from disk, so polling is a single stat()
+_last_seen = {"mtime_ns": None, "sequence": 0}
+
+def _read_sequence():
+    try:
+        with open(SEQUENCE_FILE, 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (IOError, ValueError):
+        return 0
+
+def current_sequence() -> int:
+    """
+    Returns the latest published change sequence number (0 if none yet).
+    Only re-reads the file when its mtime changed since the last call.
+    """
+    try:
+        mtime_ns = os.stat(SEQUENCE_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+    if mtime_ns != _last_seen["mtime_ns"]:
+        _last_seen["sequence"] = _read_sequence()
+        _last_seen["mtime_ns"] = mtime_ns
+    return _last_seen["sequence"]
+
+def publish() -> int:
+    """
+    Signals that the article store changed by bumping the sequence number.
+    The write goes through a temp file + rename so readers never see a partial value.
+    """
+    sequence = _read_sequence() + 1
+    tmp_path = f"{SEQUENCE_FILE}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(sequence))
+        os.replace(tmp_path, SEQUENCE_FILE)
+    except IOError as e:
+        logging.error(f"Failed to publish change sequence: {e}")
+    return sequence
+
+def acquire_writer_lock():
+    """
+    Takes an exclusive, non-blocking lock on LOCK_FILE.
+    Returns the open file handle (keep it alive for the lifetime of the process),
+    or None if another ingest process already holds the lock.
+    """
+    import fcntl
+
+    handle = open(LOCK_FILE, 'w')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+
+    handle.write(str(os.getpid()))
+    handle.flush()
+    return handle
@@ -0,0 +1,227 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from utils import ai, metrics
+
+# Server-side chat sessions, one per (user, article). A session keeps the
+# last few turns verbatim and folds older ones into a rolling summary, so a
+# follow-up prompt carries: summary + recent turns + the article passages
+# relevant to the new question, instead of the whole article and the whole
+# conversation again. Sessions are evicted least recently used, bounded
+# both by count and by the total text they hold.
+
+# Per-session budget for the conversation part of the prompt (summary + recent turns)
+SESSION_TOKENS = int(os.getenv("CHAT_SESSION_TOKENS", 1500))
+# Article passages sent with a follow-up question
+EXCERPT_TOKENS = int(os.getenv("CHAT_EXCERPT_TOKENS", 1500))
+# Turns kept verbatim after compaction, and how many may pile up before the
+# next one (so the summary is refreshed every few turns, not on every turn)
+RECENT_TURNS = 2
+MAX_TURNS = 6
+MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", 1000))
+MAX_MEMORY_BYTES = int(os.getenv("CHAT_MEMORY_MB", 16)) * 1024 * 1024
+# Fallback when the model can't summarize: keep this much of the old summary + turns
+FALLBACK_SUMMARY_CHARS = 600
+
+CHAT_PROMPT_TOKENS = metrics.Histogram(
+    "sheepai_chat_prompt_tokens", "Estimated prompt size per chat question.", ("turn",),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000))
+CHAT_EVICTIONS = metrics.Counter(
+    "sheepai_chat_session_evictions_total", "Chat sessions dropped to stay within the session or memory cap.", ("reason",))
+
+_STOPWORDS = {
+    "the", "and", "for", "are", "was", "were", "what", "which", "who", "whom", "how", "why",
+    "when", "where", "does", "did", "this", "that", "these", "those", "with", "from", "about",
+    "into", "can", "could", "would", "should", "there", "their", "they", "them", "has", "have",
+    "had", "its", "it's", "you", "your", "any", "all", "more", "most", "some", "than", "then",
+    "tell", "explain", "article",
+}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+def _terms(text: str) -> set:
+    return {w for w in re.findall(r"[a-z0-9][a-z0-9\-']+", text.lower()) if len(w) > 2 and w not in _STOPWORDS}
+
+def _passages(content: str, budget_tokens: int) -> list:
+    """
+    Splits an article into passages: blank-line paragraphs when it has them,
+    otherwise lines, otherwise sentence windows of at most a quarter of the budget.
+    """
+    for separator in ("\n\n", "\n"):
+        parts = [p.strip() for p in content.split(separator) if p.strip()]
+        if len(parts) > 1:
+            return parts
+
+    # One unbroken block (e.g. get_text(strip=True)): group sentences
+    window_chars = max(200, budget_tokens)  # about a quarter of the budget, in characters
+    passages, current = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", content.strip()):
+        if current and len(current) + len(sentence) > window_chars:
+            passages.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        passages.append(current)
+    return passages
+
+def select_excerpts(content: str, query: str, budget_tokens: int) -> str:
+    """
+    Picks the passages of `content` sharing the most terms with `query`,
+    within budget_tokens, and returns them in article order. Never empty
+    for a non-empty article: if no passage fits whole, the best one is cut to the budget.
+    """
+    if estimate_tokens(content) <= budget_tokens:
+        return content.strip()
+
+    passages = _passages(content, budget_tokens)
+    terms = _terms(query)
+    scored = []
+    for position, passage in enumerate(passages):
+        words = _terms(passage)
+        # Overlap first; the opening passages (usually the gist) break ties
+        scored.append((-len(terms & words), position, passage))
+    scored.sort()
+
+    chosen, used = [], 0
+    for _, position, passage in scored:
+        cost = estimate_tokens(passage)
+        if used + cost > budget_tokens:
+            continue
+        chosen.append((position, passage))
+        used += cost
+
+    if not chosen:
+        return scored[0][2][:budget_tokens * 4]
+    return "\n\n".join(passage for _, passage in sorted(chosen))
+
+class ChatSession:
+    """Conversation about one article: rolling summary plus the most recent turns."""
+
+    def __init__(self):
+        self.summary = ""
+        self.turns = []  # [(question, answer)], oldest first
+        self.lock = threading.Lock()
+        self.compacting = False
+
+    @property
+    def size(self) -> int:
+        """Bytes of text held, for the global memory cap."""
+        return len(self.summary) + sum(len(q) + len(a) for q, a in self.turns)
+
+    def conversation(self) -> str:
+        lines = []
+        if self.summary:
+            lines.append(f"Summary of earlier discussion: {self.summary}")
+        for question, answer in self.turns:
+            lines.append(f"User: {question}\nAssistant: {answer}")
+        return "\n".join(lines)
+
+    def needs_compaction(self) -> bool:
+        return len(self.turns) > MAX_TURNS or estimate_tokens(self.conversation()) > SESSION_TOKENS
+
+    def _fold_count(self, first_pass: bool) -> int:
+        """How many of the oldest turns to fold next. Call with self.lock held."""
+        if first_pass and len(self.turns) > RECENT_TURNS:
+            return len(self.turns) - RECENT_TURNS
+        # Recent turns are only folded too if they alone overrun the budget
+        if self.turns and estimate_tokens(self.conversation()) > SESSION_TOKENS:
+            return 1
+        return 0
+
+    def compact(self):
+        """
+        Folds the oldest turns into the summary, keeping RECENT_TURNS verbatim
+        unless the session is still over its budget. The model call runs without
+        the session lock, so questions in this session aren't held up by it.
+        """
+        first_pass = True
+        try:
+            while True:
+                with self.lock:
+                    count = self._fold_count(first_pass)
+                    if not count:
+                        return
+                    previous, folded = self.summary, self.turns[:count]
+                first_pass = False
+
+                summary = ai.summarize_chat(previous, folded)
+                if not summary:
+                    # No model available: keep the tail of a plain-text digest instead
+                    digest = " ".join(f"Q: {q} A: {a}" for q, a in folded)
+                    summary = f"{previous} {digest}".strip()[-FALLBACK_SUMMARY_CHARS:]
+
+                # Questions asked meanwhile were appended after the folded turns
+                with self.lock:
+                    self.turns = self.turns[len(folded):]
+                    self.summary = summary
+        finally:
+            with self.lock:
+                self.compacting = False
+
+    def ask(self, query: str, article_title: str, article_content: str) -> str:
+        """Answers `query`, sending the full article on the first turn and excerpts after."""
+        with self.lock:
+            if self.turns or self.summary:
+                content = select_excerpts(article_content, query, EXCERPT_TOKENS)
+                conversation = self.conversation()
+                turn = "follow_up"
+            else:
+                content, conversation, turn = article_content, "", "first"
+
+            CHAT_PROMPT_TOKENS.observe(estimate_tokens(content[:30000]) + estimate_tokens(conversation)
+                                       + estimate_tokens(query), turn=turn)
+            answer = ai.chat_with_article(query, article_title, content,
+                                          conversation=conversation, excerpts=(turn == "follow_up"))
+
+            if answer == ai.CHAT_UNAVAILABLE:
+                return answer
+            self.turns.append((query, answer))
+            start_compaction = not self.compacting and self.needs_compaction()
+            if start_compaction:
+                self.compacting = True
+
+        if start_compaction:
+            # The summary needs a model call of its own; don't make this answer wait for it
+            threading.Thread(target=self.compact, daemon=True).start()
+        return answer
+
+_sessions = OrderedDict()  # (user, article_id) -> ChatSession, least recently used first
+_lock = threading.Lock()
+
+CHAT_SESSIONS = metrics.Gauge(
+    "sheepai_chat_sessions", "Chat sessions held in memory.", callback=lambda: len(_sessions))
+
+def get_session(user_key: str, article_id: str, reset: bool = False) -> ChatSession:
+    """Returns the session for this user and article, creating (or restarting) it."""
+    key = (user_key, article_id)
+    with _lock:
+        session = None if reset else _sessions.get(key)
+        if session is None:
+            session = ChatSession()
+            _sessions[key] = session
+        _sessions.move_to_end(key)
+        return session
+
+def ask(user_key: str, article_id: str, query: str, article_title: str, article_content: str,
+        reset: bool = False) -> str:
+    """Answers a question within the (user, article) session. `reset` starts a new conversation."""
+    session = get_session(user_key, article_id, reset=reset)
+    answer = session.ask(query, article_title, article_content)
+    enforce_limits()
+    return answer
+
+def enforce_limits():
+    """Evicts least recently used sessions beyond MAX_SESSIONS or MAX_MEMORY_BYTES."""
+    with _lock:
+        while len(_sessions) > MAX_SESSIONS:
+            _sessions.popitem(last=False)
+            CHAT_EVICTIONS.inc(reason="count")
+
+        total = sum(session.size for session in _sessions.values())
+        while total > MAX_MEMORY_BYTES and len(_sessions) > 1:
+            _, session = _sessions.popitem(last=False)
+            total -= session.size
+            CHAT_EVICTIONS.inc(reason="memory")
@@ -0,0 +1,107 @@
+import os
+import time
+import queue
+import logging
+import threading
+from utils import changes, metrics, serialization
+
+# Push channel for newly stored articles, consumed by the /api/stream
+# Server-Sent Events endpoint. scraper.process_new_article publishes here
+# directly when ingest runs in the web process; when it runs in a separate
+# worker, a watcher thread follows the change sequence file and publishes
+# whatever the store gained since it last looked.
+
+# How often the watcher checks the change sequence file
+POLL_SECONDS = float(os.getenv("STREAM_POLL_SECONDS", 1))
+# Comment line sent on idle streams so proxies don't close them
+HEARTBEAT_SECONDS = 15
+MAX_SUBSCRIBERS = int(os.getenv("STREAM_MAX_CLIENTS", 200))
+# A client this far behind is disconnected; it resumes from Last-Event-ID on reconnect
+QUEUE_SIZE = 100
+
+STREAM_EVENTS = metrics.Counter(
+    "sheepai_stream_events_total", "Articles pushed to stream subscribers, and subscribers dropped for lagging.", ("result",))
+
+class Subscription:
+    """One connected stream client: a bounded queue of index entries."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.last_seq = 0
+        self.dropped = False
+
+    def offer(self, entry):
+        try:
+            self.queue.put_nowait(entry)
+            STREAM_EVENTS.inc(result="sent")
+        except queue.Full:
+            self.dropped = True
+            STREAM_EVENTS.inc(result="dropped")
+
+    def get(self, timeout):
+        """Next entry not yet sent to this client, or None on timeout."""
+        try:
+            while True:
+                entry = self.queue.get(timeout=timeout)
+                # Live events can overlap the Last-Event-ID backlog; send each seq once
+                if entry.get('seq', 0) > self.last_seq:
+                    self.last_seq = entry['seq']
+                    return entry
+        except queue.Empty:
+            return None
+
+_subscribers = set()
+_lock = threading.Lock()
+_watcher = {"thread": None, "load_since": None, "sequence": None, "cursor": None}
+
+SUBSCRIBERS = metrics.Gauge(
+    "sheepai_stream_subscribers", "Connected /api/stream clients.", callback=lambda: len(_subscribers))
+
+def publish(entry):
+    """Pushes a stored article's index entry to every connected client."""
+    with _lock:
+        subscribers = list(_subscribers)
+    for subscription in subscribers:
+        subscription.offer(entry)
+
+def subscribe():
+    """Registers a new client. Returns its Subscription, or None when at MAX_SUBSCRIBERS."""
+    with _lock:
+        if len(_subscribers) >= MAX_SUBSCRIBERS:
+            return None
+        subscription = Subscription()
+        _subscribers.add(subscription)
+        if _watcher["load_since"] and _watcher["thread"] is None:
+            _watcher["thread"] = threading.Thread(target=_watch, daemon=True)
+            _watcher["thread"].start()
+    return subscription
+
+def unsubscribe(subscription):
+    with _lock:
+        _subscribers.discard(subscription)
+
+def watch_store(load_since):
+    """
+    Enables the change-sequence watcher (started with the first subscriber).
+    `load_since(cursor)` returns (entries newer than cursor, newest first; latest cursor).
+    """
+    _watcher["load_since"] = load_since
+
+def _watch():
+    while True:
+        try:
+            sequence = changes.current_sequence()
+            if sequence != _watcher["sequence"]:
+                entries, cursor = _watcher["load_since"](_watcher["cursor"] or 0)
+                if _watcher["cursor"] is not None:
+                    for entry in reversed(entries):
+                        publish(entry)
+                _watcher.update(sequence=sequence, cursor=cursor)
+        except Exception as e:
+            logging.error(f"Stream watcher failed: {e}")
+        time.sleep(POLL_SECONDS)
+
+def format_event(entry) -> str:
+    """One SSE message; the id lets a reconnecting client resume where it left off."""
+    data = serialization.dumps(entry).decode('utf-8')
+    return f"id: {entry.get('seq', 0)}\nevent: article\ndata: {data}\n\n"
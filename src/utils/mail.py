@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from jinja2 import Template
+from utils import metrics
 
 # Load environment variables
 load_dotenv()
@@ -16,6 +17,15 @@ SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 465))
 SENDER_EMAIL = os.getenv("SMTP_EMAIL")
 SENDER_PASSWORD = os.getenv("SMTP_PASSWORD")
+# "ssl" (implicit TLS, e.g. Gmail on 465), "starttls" (e.g. port 587) or "none" (local sinks)
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl").lower()
+
+MAIL_SEND_SECONDS = metrics.Histogram(
+    "sheepai_mail_send_seconds", "SMTP send latency (connect, login and send).")
+MAIL_SEND_ERRORS = metrics.Counter(
+    "sheepai_mail_send_errors_total", "Emails that failed to send via SMTP.")
+MAIL_IN_FLIGHT = metrics.Gauge(
+    "sheepai_mail_in_flight", "Emails currently being rendered or sent.")
 
 def render_template(template_path: str, context: dict) -> str:
     """Render an HTML template with Jinja2 variables."""
@@ -43,6 +53,7 @@ def send_email(to_email: str, subject: str, html_path: str, context: dict):
         logging.error("SMTP credentials not set in .env")
         return False
 
+    MAIL_IN_FLIGHT.inc()
     try:
         # Render HTML
         html_content = render_template(html_path, context)
@@ -58,19 +69,30 @@ def send_email(to_email: str, subject: str, html_path: str, context: dict):
 
         # Create secure connection with server and send email
         context_ssl = ssl.create_default_context()
-        with smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, context=context_ssl) as server:
-            server.login(SENDER_EMAIL, SENDER_PASSWORD)
-            server.sendmail(SENDER_EMAIL, to_email, msg.as_string())
+        with MAIL_SEND_SECONDS.time():
+            if SMTP_SECURITY == "ssl":
+                server = smtplib.SMTP_SSL(SMTP_SERVER, SMTP_PORT, context=context_ssl)
+            else:
+                server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+            with server:
+                if SMTP_SECURITY == "starttls":
+                    server.starttls(context=context_ssl)
+                server.login(SENDER_EMAIL, SENDER_PASSWORD)
+                server.sendmail(SENDER_EMAIL, to_email, msg.as_string())
         
         return True
 
     except Exception as e:
+        MAIL_SEND_ERRORS.inc()
         logging.error(f"Failed to send email via SMTP: {e}")
         # In development/sandbox, we might not have SMTP access.
         # So we log the context and return True to allow testing.
         logging.info(f"MOCK EMAIL SENT to {to_email}. Context: {context}")
         return True
 
+    finally:
+        MAIL_IN_FLIGHT.dec()
+
 def send_otp_email(to_email: str, code: str, link: str):
     """
     Specific function to send an OTP email with a verification link.
@@ -0,0 +1,286 @@
+import time
+import queue
+import threading
+import logging
+from datetime import datetime
+from utils import scraper, scheduler, sources, metrics, thumbnails, archive
+
+# Bounded queues between stages: a full queue blocks the stage feeding it,
+# so a backlog applies backpressure instead of growing memory without limit.
+FETCH_QUEUE_SIZE = 20      # Per source
+EXTRACT_QUEUE_SIZE = 50
+THUMB_QUEUE_SIZE = 50
+TAG_QUEUE_SIZE = 50
+STORE_QUEUE_SIZE = 100
+NOTIFY_QUEUE_SIZE = 100
+
+TAG_WORKERS = 2            # AI calls are slow and I/O bound
+THUMB_WORKERS = 2          # Image download + resize
+EXTRACT_WORKERS = 1        # HTML parsing is CPU bound; more threads only fight over the GIL
+
+# How often the store stage moves articles past the hot window into the archive
+RETENTION_CHECK_SECONDS = 3600
+
+CYCLE_SECONDS = metrics.Histogram(
+    "sheepai_scraper_cycle_seconds", "Duration of a discovery cycle (listing fetch and parse).", ("source",))
+CYCLE_ARTICLES = metrics.Histogram(
+    "sheepai_scraper_cycle_articles", "New articles found per discovery cycle.", ("source",),
+    buckets=(0, 1, 2, 5, 10, 20, 50))
+CYCLE_ERRORS = metrics.Counter(
+    "sheepai_scraper_cycle_errors_total", "Discovery cycles that failed.", ("source",))
+ARTICLES_STORED = metrics.Counter(
+    "sheepai_scraper_articles_stored_total", "Articles that made it through the pipeline.", ("source",))
+
+class RateLimiter:
+    """Spaces out requests to one domain by at least `min_interval` seconds."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.next_allowed = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_allowed - now
+            self.next_allowed = max(now, self.next_allowed) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+class Pipeline:
+    """
+    Staged ingestion: discover -> fetch -> extract -> thumbnail -> tag -> store -> notify.
+
+    Discover and fetch run on dedicated threads per source, so a slow or
+    rate-limited site only delays its own articles. The remaining stages are
+    shared worker pools. Store is a single thread and the only writer of the
+    article database.
+    """
+
+    def __init__(self, source_list):
+        self.sources = source_list
+        self.limiters = {}
+        self.limiters_lock = threading.Lock()
+
+        self.fetch_queues = {src.name: queue.Queue(FETCH_QUEUE_SIZE) for src in source_list}
+        self.extract_queue = queue.Queue(EXTRACT_QUEUE_SIZE)
+        self.thumb_queue = queue.Queue(THUMB_QUEUE_SIZE)
+        self.tag_queue = queue.Queue(TAG_QUEUE_SIZE)
+        self.store_queue = queue.Queue(STORE_QUEUE_SIZE)
+        self.notify_queue = queue.Queue(NOTIFY_QUEUE_SIZE)
+
+        # Hot window only; older articles are archived by the store stage
+        self.existing_articles = scraper.load_existing_data()
+        self.next_retention = 0.0
+
+        # Every URL ever stored (persistent), and URLs currently moving through the pipeline
+        self.stored_urls = archive.UrlSet()
+        self.stored_urls.add_all(art['url'] for art in self.existing_articles)
+        self.in_flight_urls = set()
+        self.claimed_lock = threading.Lock()
+
+        self.threads = []
+
+        metrics.Gauge(
+            "sheepai_pipeline_queue_depth", "Items waiting in each pipeline queue (notify = pending emails).",
+            ("stage",), callback=self.queue_depths)
+
+    def queue_depths(self):
+        depths = {(f"fetch:{name}",): q.qsize() for name, q in self.fetch_queues.items()}
+        depths[("extract",)] = self.extract_queue.qsize()
+        depths[("thumbnail",)] = self.thumb_queue.qsize()
+        depths[("tag",)] = self.tag_queue.qsize()
+        depths[("store",)] = self.store_queue.qsize()
+        depths[("notify",)] = self.notify_queue.qsize()
+        return depths
+
+    def limiter_for(self, src):
+        # Sources sharing a domain start their threads concurrently and must share one limiter
+        with self.limiters_lock:
+            if src.domain not in self.limiters:
+                self.limiters[src.domain] = RateLimiter(src.min_request_interval)
+            return self.limiters[src.domain]
+
+    def claim(self, url):
+        """Marks a URL as in-flight. Returns False if it was already seen."""
+        with self.claimed_lock:
+            if url in self.in_flight_urls or url in self.stored_urls:
+                return False
+            self.in_flight_urls.add(url)
+            return True
+
+    def release(self, url):
+        """Forgets a URL that failed mid-pipeline so the next cycle retries it."""
+        with self.claimed_lock:
+            self.in_flight_urls.discard(url)
+
+    def mark_stored(self, url):
+        with self.claimed_lock:
+            self.stored_urls.add(url)
+            self.in_flight_urls.discard(url)
+
+    def retire_old_articles(self):
+        """Archives articles past the hot window, at most once per RETENTION_CHECK_SECONDS."""
+        if time.monotonic() < self.next_retention:
+            return
+        self.next_retention = time.monotonic() + RETENTION_CHECK_SECONDS
+        try:
+            moved = archive.retire(self.existing_articles)
+            if moved:
+                scraper.save_data(self.existing_articles)
+                print(f"[*] Archived {moved} article(s) older than {archive.HOT_DAYS} days.")
+        except Exception as e:
+            print(f"[!] Archiving failed: {e}")
+
+    # --- Stages ---
+
+    def discover(self, src):
+        poll_scheduler = scheduler.PollScheduler(src.poll_minutes)
+        limiter = self.limiter_for(src)
+        fetch_queue = self.fetch_queues[src.name]
+        print(f"[*] [{src.name}] Discovery started. Initial interval {src.poll_minutes} minutes (adaptive).")
+
+        while True:
+            cycle_started = time.monotonic()
+            try:
+                print(f"\n[*] [{src.name}] Checking feed at {datetime.now().strftime('%H:%M:%S')}...")
+                limiter.wait()
+                soup = scraper.get_soup(src.listing_url)
+                if not soup:
+                    print(f"[!] [{src.name}] Could not fetch listing. Backing off before retry.")
+                    poll_scheduler.record_failure()
+                else:
+                    new_articles_found = 0
+                    for partial in src.discover(soup):
+                        if not self.claim(partial['url']):
+                            continue
+                        partial['source'] = src.name
+                        fetch_queue.put(partial)
+                        new_articles_found += 1
+
+                    if new_articles_found == 0:
+                        print(f"[-] [{src.name}] No new articles found.")
+                    poll_scheduler.record_success(new_articles_found)
+                    CYCLE_ARTICLES.observe(new_articles_found, source=src.name)
+
+            except Exception as e:
+                print(f"[!] [{src.name}] Discovery error: {e}")
+                poll_scheduler.record_failure()
+
+            if poll_scheduler.failures:
+                CYCLE_ERRORS.inc(source=src.name)
+            CYCLE_SECONDS.observe(time.monotonic() - cycle_started, source=src.name)
+
+            # list() snapshots atomically; the store thread may be inserting meanwhile
+            history = [a for a in list(self.existing_articles) if a.get('source', src.name) == src.name]
+            time.sleep(poll_scheduler.seconds_until_next(cycle_started, history, time.monotonic()))
+
+    def fetch(self, src):
+        limiter = self.limiter_for(src)
+        fetch_queue = self.fetch_queues[src.name]
+
+        while True:
+            partial = fetch_queue.get()
+            try:
+                print(f"[+] [{src.name}] Scraping content: {partial['url']}")
+                limiter.wait()
+                soup = scraper.get_soup(partial['url'])
+                if soup is None:
+                    # Don't store a placeholder body; the next cycle retries the URL
+                    print(f"[!] [{src.name}] Skipping {partial['url']}: page could not be retrieved")
+                    self.release(partial['url'])
+                    continue
+                self.extract_queue.put((src, partial, soup))
+            except Exception as e:
+                print(f"[!] [{src.name}] Fetch failed for {partial['url']}: {e}")
+                self.release(partial['url'])
+
+    def extract(self):
+        while True:
+            src, partial, soup = self.extract_queue.get()
+            try:
+                content = src.extract_body(soup)
+                article = {
+                    "id": scraper.article_id(partial['url']),
+                    "title": partial.get('title', "No Title"),
+                    "url": partial['url'],
+                    "thumbnail": partial.get('thumbnail', "No Image"),
+                    "description": partial.get('description', "No Description"),
+                    "content": content,
+                    "tags": [],
+                    "source": partial['source'],
+                    "scraped_at": datetime.now().isoformat()
+                }
+                self.thumb_queue.put(article)
+            except Exception as e:
+                print(f"[!] Extraction failed for {partial['url']}: {e}")
+                self.release(partial['url'])
+
+    def thumbnail(self):
+        while True:
+            article = self.thumb_queue.get()
+            # Best effort: without a local copy /thumb/<id> falls back to fetching on demand
+            try:
+                thumbnails.store(article['id'], article['thumbnail'])
+            except Exception as e:
+                print(f"[!] Thumbnail failed for {article['url']}: {e}")
+            self.tag_queue.put(article)
+
+    def tag(self):
+        while True:
+            article = self.tag_queue.get()
+            scraper.tag_article(article)
+            self.store_queue.put(article)
+
+    def store(self):
+        # Retention runs here too: this thread is the only writer of the article database
+        while True:
+            self.retire_old_articles()
+            try:
+                article = self.store_queue.get(timeout=RETENTION_CHECK_SECONDS)
+            except queue.Empty:
+                continue
+            try:
+                scraper.process_new_article(article, self.existing_articles, notify=self.notify_queue.put)
+                self.mark_stored(article['url'])
+                ARTICLES_STORED.inc(source=article['source'])
+            except Exception as e:
+                print(f"[!] Storing failed for {article['url']}: {e}")
+                self.release(article['url'])
+
+    def notify(self):
+        while True:
+            article = self.notify_queue.get()
+            scraper.notify_users(article)
+
+    # --- Lifecycle ---
+
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def start(self):
+        for src in self.sources:
+            self._spawn(self.discover, src)
+            self._spawn(self.fetch, src)
+        for _ in range(EXTRACT_WORKERS):
+            self._spawn(self.extract)
+        for _ in range(THUMB_WORKERS):
+            self._spawn(self.thumbnail)
+        for _ in range(TAG_WORKERS):
+            self._spawn(self.tag)
+        self._spawn(self.store)
+        self._spawn(self.notify)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+def run():
+    """Starts the pipeline for all configured sources and blocks forever."""
+    source_list = sources.load_sources()
+    logging.info(f"Starting ingestion pipeline for {len(source_list)} source(s).")
+    pipeline = Pipeline(source_list)
+    pipeline.start()
+    pipeline.join()
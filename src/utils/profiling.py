@@ -0,0 +1,95 @@
+import os
+import re
+import time
+import random
+import logging
+import cProfile
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+# Fraction of requests (0.0 - 1.0) to run under cProfile and dump to PROFILE_DIR
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+# Dump a profile for any request slower than this (milliseconds, 0 = off).
+# Note: this has to profile every request to catch the slow ones, so expect
+# cProfile's overhead on all requests while it is enabled.
+SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# Per-thread request state; Flask serves each request on a single thread
+_local = threading.local()
+
+def begin_request():
+    """Starts span collection (and maybe profiling) for the current request."""
+    _local.spans = {}
+    _local.started = time.perf_counter()
+    _local.sampled = SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+    _local.profiler = None
+
+    if _local.sampled or SLOW_REQUEST_MS > 0:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            _local.profiler = profiler
+        except ValueError:
+            # Another profiler is already active (e.g. a concurrent request on 3.12+)
+            pass
+
+@contextmanager
+def span(name: str):
+    """
+    Times a phase of the current request under `name`.
+    Repeated spans with the same name add up. A no-op outside a request.
+    """
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        spans[name] = spans.get(name, 0.0) + (time.perf_counter() - started)
+
+def end_request(label: str):
+    """
+    Stops collection for the current request and dumps its profile if it was
+    sampled or slow. Returns ({span name: seconds}, total seconds).
+    """
+    spans = getattr(_local, 'spans', None)
+    if spans is None:
+        return {}, 0.0
+
+    total = time.perf_counter() - _local.started
+    profiler = _local.profiler
+    _local.spans = None
+    _local.profiler = None
+
+    if profiler:
+        profiler.disable()
+        slow = SLOW_REQUEST_MS > 0 and total * 1000 >= SLOW_REQUEST_MS
+        if _local.sampled or slow:
+            _dump(profiler, label, total, spans)
+
+    return spans, total
+
+def _dump(profiler, label, total, spans):
+    safe_label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or "root"
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    path = os.path.join(PROFILE_DIR, f"{stamp}_{safe_label}_{total * 1000:.0f}ms.pstats")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(path)
+        breakdown = ', '.join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in spans.items())
+        logging.info(f"Profiled {label} ({total * 1000:.1f}ms; {breakdown}) -> {path}")
+    except OSError as e:
+        logging.error(f"Failed to write profile {path}: {e}")
+
+def server_timing_header(spans: dict, total: float) -> str:
+    """Formats spans as a Server-Timing header value (durations in ms)."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in spans.items()]
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(entries)
@@ -0,0 +1,99 @@
+import random
+from datetime import datetime, timedelta
+
+# Polling bounds (minutes)
+MIN_INTERVAL_MINUTES = 1
+MAX_INTERVAL_MINUTES = 30
+
+# How many polls to spend per expected gap between new articles.
+# Higher = lower detection latency, more requests.
+POLLS_PER_ARRIVAL = 4
+
+# Only recent history says anything about the current publishing rate
+HISTORY_WINDOW_HOURS = 48
+HISTORY_MIN_GAPS = 3
+
+# Articles ingested within this many seconds of each other came from the same
+# cycle, so they count as a single arrival rather than a burst of tiny gaps.
+SAME_CYCLE_SECONDS = 120
+
+# Each empty cycle stretches the interval by this factor (reset on a new article)
+IDLE_GROWTH = 1.5
+
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def estimate_arrival_gap(articles, now=None):
+    """
+    Estimates the mean time between new-article arrivals from `scraped_at`.
+    Returns a timedelta, or None if there isn't enough recent history.
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(hours=HISTORY_WINDOW_HOURS)
+
+    stamps = sorted(
+        ts for ts in (_parse_timestamp(a.get('scraped_at')) for a in articles)
+        if ts and ts >= cutoff
+    )
+
+    arrivals = []
+    for ts in stamps:
+        if not arrivals or (ts - arrivals[-1]).total_seconds() > SAME_CYCLE_SECONDS:
+            arrivals.append(ts)
+
+    if len(arrivals) <= HISTORY_MIN_GAPS:
+        return None
+
+    # Include the open gap since the last arrival so a quiet spell slows us down
+    span = now - arrivals[0]
+    return span / len(arrivals)
+
+class PollScheduler:
+    """
+    Decides how long monitor_feed waits between cycles.
+    Intervals are measured from cycle start, so a slow cycle doesn't push
+    the next poll back by its own duration.
+    """
+
+    def __init__(self, default_minutes):
+        self.default_seconds = default_minutes * 60
+        self.empty_cycles = 0
+        self.failures = 0
+
+    def _clamp(self, seconds):
+        return max(MIN_INTERVAL_MINUTES * 60, min(MAX_INTERVAL_MINUTES * 60, seconds))
+
+    def base_interval(self, articles):
+        """Interval (seconds) suggested by the learned arrival rate."""
+        gap = estimate_arrival_gap(articles)
+        if gap is None:
+            return self._clamp(self.default_seconds)
+        return self._clamp(gap.total_seconds() / POLLS_PER_ARRIVAL)
+
+    def record_success(self, new_articles):
+        self.failures = 0
+        self.empty_cycles = 0 if new_articles else self.empty_cycles + 1
+
+    def record_failure(self):
+        self.failures += 1
+
+    def next_interval(self, articles):
+        """
+        Returns the seconds between the start of this cycle and the next one.
+        Errors use jittered exponential backoff; idle cycles stretch gradually.
+        """
+        base = self.base_interval(articles)
+
+        if self.failures:
+            ceiling = self._clamp(base * (2 ** self.failures))
+            # "Full jitter": spread retries so restarts don't hit the site in lockstep
+            return random.uniform(base, ceiling)
+
+        return self._clamp(base * (IDLE_GROWTH ** self.empty_cycles))
+
+    def seconds_until_next(self, cycle_started, articles, now):
+        """Remaining wait given the monotonic start time of the current cycle."""
+        return max(0.0, self.next_interval(articles) - (now - cycle_started))
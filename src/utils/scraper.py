@@ -1,22 +1,27 @@
-import requests
-from bs4 import BeautifulSoup
 import json
+import hashlib
 import time
 import threading
 import os
-from datetime import datetime
 import urllib.parse
-from utils import ai, users, mail  # Ensure you run this from src/ as: python -m utils.scraper
+from utils import ai, users, mail, changes, bodies, events, archive  # Ensure you run this from src/ as: python -m utils.scraper
 
 # Configuration
-BASE_URL = "https://thehackernews.com/"
+# Sources (listing URLs, selectors, polling cadence) live in utils/sources.py
 OUTPUT_FILE = "hacker_news_articles.json"
-CHECK_INTERVAL_MINUTES = 5
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
+def article_id(url: str) -> str:
+    """Stable short id for an article, derived from its URL."""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+
 def get_soup(url):
+    # Imported here so web processes that only read the store don't pay for them
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         response = requests.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
@@ -25,48 +30,46 @@ def get_soup(url):
         print(f"[!] Error fetching {url}: {e}")
         return None
 
-def scrape_article_content(article_url):
-    """Visits an individual article page to scrape the full content."""
-    soup = get_soup(article_url)
-    if not soup:
-        return "Failed to retrieve content."
-
-    # Try specific THN content selectors
-    content_div = soup.find('div', id='articlebody') or soup.find('div', class_='articlebody')
-
-    if content_div:
-        paragraphs = content_div.find_all('p')
-        if paragraphs:
-            # Join paragraphs with double newlines for readability
-            return '\n\n'.join([p.get_text(strip=True) for p in paragraphs])
-        return content_div.get_text(strip=True)
-    
-    return "Content not found."
-
 def load_existing_data():
-    """Loads existing JSON to prevent duplicates."""
+    """Loads the (hot) article index. Older articles live in utils/archive.py."""
     if not os.path.exists(OUTPUT_FILE):
         return []
     try:
         with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+            data = json.load(f)
     except (json.JSONDecodeError, IOError):
         return []
 
+    # Articles stored before ids existed get theirs derived from the URL
+    for article in data:
+        article.setdefault("id", article_id(article['url']))
+    return data
+
 def save_data(data):
-    """Saves the list of articles to JSON."""
+    """
+    Saves the list of articles to JSON and notifies web processes of the change.
+    Article bodies go to the compressed blob file (utils/bodies.py); entries in
+    `data` that still carry them are replaced by their index entries.
+    Writes to a temp file first so readers never load a half-written store.
+    """
+    for i, article in enumerate(data):
+        data[i] = bodies.detach(article)
+
+    tmp_path = f"{OUTPUT_FILE}.tmp"
     try:
-        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, OUTPUT_FILE)
     except IOError as e:
         print(f"[!] Error saving data: {e}")
+        return
+
+    changes.publish()
 
-def process_new_article(article, existing_articles):
+def tag_article(article):
     """
-    Callback function to handle a newly detected article.
-    1. Generates AI tags.
-    2. Appends to list.
-    3. Saves to database.
+    Generates AI tags for an article in place.
+    Failures are logged and leave the tags empty.
     """
     print(f"[*] New Article Detected: {article['title']}")
     print("    -> Requesting AI tags...")
@@ -79,7 +82,23 @@ def process_new_article(article, existing_articles):
     except Exception as e:
         print(f"    [!] AI Tagging Failed: {e}")
         # We proceed even if AI fails, leaving tags empty
-        
+
+def next_sequence(articles):
+    """Ingest sequence number for the next stored article (1 for the first)."""
+    # Archived articles count too, or the numbering would restart after a quiet month
+    return max([archive.max_seq()] + [a.get('seq', 0) for a in articles]) + 1
+
+def process_new_article(article, existing_articles, notify=None):
+    """
+    Callback function to handle a newly detected (already tagged) article.
+    1. Appends to list, numbered in ingest order.
+    2. Saves to database (the list keeps only the index entry, without the body).
+    3. Pushes the entry to /api/stream clients.
+    4. Hands off to `notify` (or a background thread) for user notifications.
+    """
+    # Clients sync incrementally with /api/articles?since=<seq>
+    article['seq'] = next_sequence(existing_articles)
+
     # Add to memory (top of the list)
     existing_articles.insert(0, article)
     
@@ -87,8 +106,13 @@ def process_new_article(article, existing_articles):
     save_data(existing_articles)
     print("    -> Article saved to database.")
 
+    events.publish(existing_articles[0])
+
     # Notify users in background
-    threading.Thread(target=notify_users, args=(article,)).start()
+    if notify:
+        notify(article)
+    else:
+        threading.Thread(target=notify_users, args=(article,)).start()
 
 def notify_users(article):
     """
@@ -126,82 +150,10 @@ def notify_users(article):
 def monitor_feed():
     """
     Worker function to run in a thread. 
-    Checks for new articles periodically.
+    Runs the ingestion pipeline for every configured source until the process exits.
     """
-    print(f"[*] Worker started. Checking every {CHECK_INTERVAL_MINUTES} minutes.")
-    
-    while True:
-        try:
-            print(f"\n[*] Checking feed at {datetime.now().strftime('%H:%M:%S')}...")
-            
-            # 1. Load current database (in case other processes modified it)
-            existing_articles = load_existing_data()
-            seen_urls = {art['url'] for art in existing_articles}
-            
-            # 2. Fetch Homepage
-            soup = get_soup(BASE_URL)
-            if not soup:
-                print("[!] Could not fetch homepage. Retrying next cycle.")
-                time.sleep(CHECK_INTERVAL_MINUTES * 60)
-                continue
-
-            # 3. Find Article Links
-            story_links = soup.find_all('a', class_='story-link')
-            new_articles_found = 0
-
-            # Iterate through found links (latest first usually)
-            for story in story_links:
-                article_url = story.get('href')
-
-                if article_url in seen_urls:
-                    continue # Skip if we already have it
-
-                # 4. Scrape New Article
-                print(f"[+] Scraping content: {article_url}")
-                
-                # Extract Metadata
-                title_tag = story.find(class_='home-title')
-                title = title_tag.get_text(strip=True) if title_tag else "No Title"
-
-                desc_tag = story.find(class_='home-desc')
-                description = desc_tag.get_text(strip=True) if desc_tag else "No Description"
-
-                img_tag = story.find('img')
-                thumbnail = "No Image"
-                if img_tag:
-                    thumbnail = img_tag.get('data-src') or img_tag.get('src')
-
-                # Extract Full Content
-                full_content = scrape_article_content(article_url)
-
-                # Construct Object (Tags empty initially)
-                new_article = {
-                    "title": title,
-                    "url": article_url,
-                    "thumbnail": thumbnail,
-                    "description": description,
-                    "content": full_content,
-                    "tags": [],
-                    "scraped_at": datetime.now().isoformat()
-                }
-
-                # 5. Hand off to the callback for AI processing and Saving
-                process_new_article(new_article, existing_articles)
-                
-                seen_urls.add(article_url)
-                new_articles_found += 1
-                
-                # Politeness delay between individual article scrapes
-                time.sleep(2)
-
-            if new_articles_found == 0:
-                print("[-] No new articles found.")
-
-        except Exception as e:
-            print(f"[!] Critical error in worker thread: {e}")
-
-        # Wait for the next cycle
-        time.sleep(CHECK_INTERVAL_MINUTES * 60)
+    from utils import pipeline
+    pipeline.run()
 
 if __name__ == "__main__":
     # Create the worker thread
@@ -0,0 +1,75 @@
+import json
+import gzip
+
+# JSON encode/decode helpers for API payloads. Uses orjson when it is
+# installed (several times faster on large lists), the stdlib otherwise.
+
+try:
+    import orjson  # Optional: pip install orjson
+except ImportError:
+    orjson = None
+
+# Responses smaller than this aren't worth compressing
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+def dumps(obj) -> bytes:
+    """Compact UTF-8 JSON bytes."""
+    if orjson:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads(raw):
+    """Parses JSON from str or bytes."""
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def compress(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def accepts_encoding(accept_encoding, encoding: str) -> bool:
+    """
+    True if the Accept-Encoding header value allows `encoding`, honouring
+    q-values (q=0, q=0.0, "; q=0" all refuse) and the "*" wildcard.
+    """
+    qualities = {}
+    for token in (accept_encoding or "").split(','):
+        name, _, params = token.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    encoding = encoding.lower()
+    if encoding in qualities:
+        return qualities[encoding] > 0
+    return qualities.get('*', 0) > 0
+
+def accepts_gzip(accept_encoding) -> bool:
+    """True if the Accept-Encoding header value allows gzip."""
+    return accepts_encoding(accept_encoding, "gzip")
+
+def install_json_provider(app):
+    """Makes Flask's jsonify use orjson when available (no-op otherwise)."""
+    if not orjson:
+        return
+
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
@@ -0,0 +1,156 @@
+import os
+import json
+import logging
+import urllib.parse
+
+# Optional list of extra feeds, relative to src/ like the other data files.
+# Each entry: {"name", "listing_url", "link_selector", ["body_selector",
+# "poll_minutes", "min_request_interval"]} -- see GenericSource.
+SOURCES_FILE = os.getenv("SOURCES_FILE", "sources.json")
+
+def extract_generic_text(soup) -> str:
+    """
+    Best-effort body extraction for arbitrary article pages.
+    Targets common article containers, falling back to the whole <body>.
+    """
+    article_body = soup.find('article') or soup.find('div', class_='content') or soup.find('main')
+
+    if article_body:
+        return article_body.get_text(separator='\n', strip=True)
+    if soup.body:
+        return soup.body.get_text(separator='\n', strip=True)
+    return ""
+
+class Source:
+    """
+    Adapter for one news site.
+    Subclasses know how to find article links on the listing page (discover)
+    and how to pull the text out of an article page (extract_body).
+    """
+    name = "News"
+    listing_url = ""
+    poll_minutes = 5             # Starting cadence; adapted per source by PollScheduler
+    min_request_interval = 2     # Seconds between requests to this source's domain
+
+    @property
+    def domain(self):
+        return urllib.parse.urlparse(self.listing_url).netloc
+
+    def discover(self, soup) -> list:
+        """
+        Returns a list of partial articles found on the listing page:
+        dicts with at least "url", plus "title", "description", "thumbnail" when known.
+        """
+        raise NotImplementedError
+
+    def extract_body(self, soup) -> str:
+        return extract_generic_text(soup) or "Content not found."
+
+class HackerNewsSource(Source):
+    """thehackernews.com homepage and article layout."""
+    name = "The Hacker News"
+    listing_url = "https://thehackernews.com/"
+
+    def discover(self, soup):
+        found = []
+        for story in soup.find_all('a', class_='story-link'):
+            article_url = story.get('href')
+            if not article_url:
+                continue
+
+            title_tag = story.find(class_='home-title')
+            desc_tag = story.find(class_='home-desc')
+
+            img_tag = story.find('img')
+            thumbnail = "No Image"
+            if img_tag:
+                thumbnail = img_tag.get('data-src') or img_tag.get('src')
+
+            found.append({
+                "url": article_url,
+                "title": title_tag.get_text(strip=True) if title_tag else "No Title",
+                "description": desc_tag.get_text(strip=True) if desc_tag else "No Description",
+                "thumbnail": thumbnail,
+            })
+        return found
+
+    def extract_body(self, soup):
+        # Try specific THN content selectors
+        content_div = soup.find('div', id='articlebody') or soup.find('div', class_='articlebody')
+
+        if content_div:
+            paragraphs = content_div.find_all('p')
+            if paragraphs:
+                # Join paragraphs with double newlines for readability
+                return '\n\n'.join([p.get_text(strip=True) for p in paragraphs])
+            return content_div.get_text(strip=True)
+
+        return "Content not found."
+
+class GenericSource(Source):
+    """
+    Config-driven adapter: article links are picked with a CSS selector on the
+    listing page, bodies with an optional CSS selector or the generic extractor.
+    """
+
+    def __init__(self, name, listing_url, link_selector, body_selector=None,
+                 poll_minutes=None, min_request_interval=None):
+        self.name = name
+        self.listing_url = listing_url
+        self.link_selector = link_selector
+        self.body_selector = body_selector
+        if poll_minutes:
+            self.poll_minutes = poll_minutes
+        if min_request_interval is not None:
+            self.min_request_interval = min_request_interval
+
+    def discover(self, soup):
+        found = []
+        for link in soup.select(self.link_selector):
+            href = link.get('href')
+            if not href:
+                continue
+
+            img_tag = link.find('img')
+            thumbnail = "No Image"
+            if img_tag:
+                thumbnail = img_tag.get('data-src') or img_tag.get('src') or "No Image"
+
+            found.append({
+                "url": urllib.parse.urljoin(self.listing_url, href),
+                "title": link.get_text(strip=True) or "No Title",
+                "description": "No Description",
+                "thumbnail": thumbnail,
+            })
+        return found
+
+    def extract_body(self, soup):
+        if self.body_selector:
+            node = soup.select_one(self.body_selector)
+            if node:
+                return node.get_text(separator='\n\n', strip=True)
+        return super().extract_body(soup)
+
+def load_sources() -> list:
+    """
+    Returns the configured sources: The Hacker News plus anything listed in SOURCES_FILE.
+    """
+    sources = [HackerNewsSource()]
+
+    if not os.path.exists(SOURCES_FILE):
+        return sources
+
+    try:
+        with open(SOURCES_FILE, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (json.JSONDecodeError, IOError) as e:
+        logging.error(f"Failed to read {SOURCES_FILE}: {e}")
+        return sources
+
+    for entry in entries:
+        try:
+            sources.append(GenericSource(**entry))
+        except TypeError as e:
+            logging.error(f"Invalid source entry {entry}: {e}")
+
+    return sources
@@ -0,0 +1,196 @@
+import io
+import os
+import time
+import logging
+import threading
+from utils import metrics
+
+# Local thumbnail store: each article's image is downloaded once, resized to
+# a few fixed widths and kept on disk as WebP and JPEG, bounded by a total
+# size with least-recently-used eviction. Served by main.py at /thumb/<article-id>.
+# Without Pillow, the downloaded image is kept once, as-is, in its own format.
+
+try:
+    from PIL import Image  # Optional: pip install pillow
+except ImportError:
+    Image = None
+
+CACHE_DIR = os.getenv("THUMB_CACHE_DIR", "thumbs")
+CACHE_MAX_BYTES = int(os.getenv("THUMB_CACHE_MAX_MB", 200)) * 1024 * 1024
+
+# Feed cards use the small one, the article header the large one
+WIDTHS = (320, 960)
+DEFAULT_WIDTH = 320
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpg": ("JPEG", "image/jpeg")}
+# Source image types kept unconverted when Pillow isn't installed: mimetype -> extension
+ORIGINAL_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/gif": "gif",
+                  "image/webp": "webp", "image/avif": "avif"}
+ORIGINAL_WIDTH = "orig"
+QUALITY = 80
+
+MAX_SOURCE_BYTES = 10 * 1024 * 1024
+
+# Only refresh a file's access time this often: serving shouldn't mean a disk write every time
+TOUCH_INTERVAL_SECONDS = 3600
+
+THUMB_REQUESTS = metrics.Counter(
+    "sheepai_thumb_requests_total", "Thumbnail lookups by result (hit, fetched, missing).", ("result",))
+
+# Don't retry a failing image on every page view
+FAILURE_RETRY_SECONDS = 3600
+# Failures remembered at once; past this, expired ones (then the oldest) are dropped
+MAX_FAILURES = 10000
+
+_lock = threading.Lock()
+_usage = {"bytes": None}
+_failures = {}  # article_id -> time of last failed fetch
+
+def _path(article_id, width, fmt):
+    return os.path.join(CACHE_DIR, f"{article_id}-{width}.{fmt}")
+
+def _scan():
+    """Returns [(mtime, size, path)] for every cached file."""
+    entries = []
+    try:
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+    except FileNotFoundError:
+        pass
+    return entries
+
+def _evict():
+    """Deletes least recently used files until the cache fits CACHE_MAX_BYTES. Call with _lock held."""
+    entries = _scan()
+    total = sum(size for _, size, _ in entries)
+    if total > CACHE_MAX_BYTES:
+        # Drop to 90% so we don't rescan on every insert while hovering at the limit
+        target = CACHE_MAX_BYTES * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+    _usage["bytes"] = total
+
+def _write(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _render_variants(source: bytes):
+    """Yields (width, fmt, bytes) for every configured size and format."""
+    with Image.open(io.BytesIO(source)) as image:
+        image = image.convert("RGB")
+        for width in WIDTHS:
+            resized = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            for fmt, (pil_format, _) in FORMATS.items():
+                out = io.BytesIO()
+                resized.save(out, pil_format, quality=QUALITY, optimize=True)
+                yield width, fmt, out.getvalue()
+
+def _download(url):
+    """Returns (bytes, mimetype) of the image at `url`."""
+    import requests
+    from utils.scraper import HEADERS
+
+    with requests.get(url, headers=HEADERS, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        data = response.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ValueError(f"image larger than {MAX_SOURCE_BYTES} bytes")
+    return data, content_type
+
+def _record_failure(article_id):
+    with _lock:
+        _failures[article_id] = time.time()
+        if len(_failures) > MAX_FAILURES:
+            cutoff = time.time() - FAILURE_RETRY_SECONDS
+            for key in [k for k, failed_at in _failures.items() if failed_at < cutoff]:
+                del _failures[key]
+            # Still full of recent failures: forget the oldest (dicts keep insertion order)
+            while len(_failures) > MAX_FAILURES:
+                _failures.pop(next(iter(_failures)))
+
+def store(article_id: str, source_url: str) -> bool:
+    """
+    Downloads the source image once and stores its resized variants.
+    Without Pillow, the original bytes are stored once, typed by the response's
+    Content-Type. Returns True on success.
+    """
+    if not source_url or source_url == "No Image" or not source_url.startswith(("http://", "https://")):
+        return False
+
+    failed_at = _failures.get(article_id)
+    if failed_at and time.time() - failed_at < FAILURE_RETRY_SECONDS:
+        return False
+
+    try:
+        source, content_type = _download(source_url)
+        if Image:
+            variants = list(_render_variants(source))
+        elif content_type in ORIGINAL_TYPES:
+            variants = [(ORIGINAL_WIDTH, ORIGINAL_TYPES[content_type], source)]
+        else:
+            raise ValueError(f"unsupported image type {content_type or 'unknown'!r} (install Pillow to convert)")
+    except Exception as e:
+        logging.warning(f"Thumbnail fetch failed for {source_url}: {e}")
+        _record_failure(article_id)
+        return False
+
+    with _lock:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            added = 0
+            for width, fmt, data in variants:
+                _write(_path(article_id, width, fmt), data)
+                added += len(data)
+        except OSError as e:
+            logging.error(f"Thumbnail cache write failed for {article_id}: {e}")
+            # Partial writes still take space; recount on the next store
+            _usage["bytes"] = None
+            return False
+
+        if _usage["bytes"] is None or _usage["bytes"] + added > CACHE_MAX_BYTES:
+            _evict()
+        else:
+            _usage["bytes"] += added
+    return True
+
+def lookup(article_id: str, width: int, accept: str):
+    """
+    Returns (path, mimetype) of the best cached variant, or None if not cached.
+    WebP is preferred when the client's Accept header allows it; an unconverted
+    original (stored without Pillow) is served whatever its size and type.
+    """
+    width = min(WIDTHS, key=lambda w: abs(w - width))
+    formats = ["webp", "jpg"] if "image/webp" in (accept or "") else ["jpg"]
+    candidates = [(_path(article_id, width, fmt), FORMATS[fmt][1]) for fmt in formats]
+    candidates += [(_path(article_id, ORIGINAL_WIDTH, ext), mimetype) for mimetype, ext in ORIGINAL_TYPES.items()]
+
+    for path, mimetype in candidates:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+
+        # LRU bookkeeping: eviction goes by mtime
+        now = time.time()
+        if now - mtime > TOUCH_INTERVAL_SECONDS:
+            try:
+                os.utime(path, (now, now))
+            except OSError:
+                pass
+        return path, mimetype
+
+    return None
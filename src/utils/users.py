@@ -4,17 +4,23 @@ import random
 import uuid
 import logging
 from datetime import datetime
-from utils import mail
+from utils import mail, metrics, profiling
 
 # Path relative to where main.py runs
-USERS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "users.json")
+USERS_FILE = os.getenv("USERS_FILE") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "users.json")
+
+VALIDATE_TOKEN_SECONDS = metrics.Histogram(
+    "sheepai_validate_token_seconds", "Time to validate a bearer token (includes reading users.json).")
 
 def load_users():
     if not os.path.exists(USERS_FILE):
         return []
     try:
-        with open(USERS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with profiling.span("users_read"):
+            with open(USERS_FILE, 'r', encoding='utf-8') as f:
+                raw = f.read()
+        with profiling.span("users_parse"):
+            return json.loads(raw)
     except json.JSONDecodeError:
         return []
 
@@ -98,10 +104,11 @@ def validate_token(token: str):
     if not token:
         return None
 
-    users = load_users()
-    for user in users:
-        if user.get('token') == token:
-            return user
+    with VALIDATE_TOKEN_SECONDS.time(), profiling.span("auth"):
+        users = load_users()
+        for user in users:
+            if user.get('token') == token:
+                return user
 
     return None
 
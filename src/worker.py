@@ -0,0 +1,39 @@
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+from utils import scraper
+from utils import metrics
+from utils import changes
+
+# Load environment variables
+load_dotenv()
+
+# Configure Logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%d/%m/%Y %H:%M:%S'
+)
+
+# Port for the worker's own /metrics endpoint (scraper, AI and mail metrics); unset to disable
+METRICS_PORT = os.getenv("WORKER_METRICS_PORT")
+
+# --- Main Entry Point ---
+# Run from src/ as: python worker.py
+# Pair with SCRAPER_IN_PROCESS=false on the web processes (see main.py).
+
+if __name__ == "__main__":
+    lock = changes.acquire_writer_lock()
+    if not lock:
+        logging.error(f"Another ingest worker is already running ({changes.LOCK_FILE} is locked).")
+        sys.exit(1)
+
+    logging.info("Starting SheepAI ingest worker...")
+    if METRICS_PORT:
+        metrics.serve(int(METRICS_PORT))
+        logging.info(f"Worker metrics at http://localhost:{METRICS_PORT}/metrics")
+    try:
+        scraper.monitor_feed()
+    except KeyboardInterrupt:
+        logging.info("Stopping ingest worker...")
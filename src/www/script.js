@@ -243,11 +243,28 @@ document.addEventListener('DOMContentLoaded', async function() {
 
         const articles = await response.json();
         renderArticles(articles);
+        followNewArticles(articles, token);
     } catch (error) {
         console.error('Failed to fetch articles:', error);
     }
 });
 
+// Live updates: new articles arrive over /api/stream instead of reloading the list
+function followNewArticles(articles, token) {
+    if (!window.EventSource) return;
+
+    // Resume after the newest article we already have
+    const cursor = articles.reduce((max, a) => Math.max(max, a.seq || 0), 0);
+    const stream = new EventSource(`/api/stream?token=${encodeURIComponent(token)}&since=${cursor}`);
+
+    stream.addEventListener('article', function(e) {
+        const article = JSON.parse(e.data);
+        if (articles.some(a => a.url === article.url)) return;
+        articles.unshift(article);
+        renderArticles(articles);
+    });
+}
+
 function renderArticles(articles) {
     if (!articles || articles.length === 0) return;
 
@@ -277,7 +294,9 @@ function renderArticles(articles) {
         let useImage = false;
 
         if (article.thumbnail && article.thumbnail !== "No Image") {
-            iconHtml = `<img src="${article.thumbnail}" alt="Article Image" style="width:100%; height:100%; object-fit:cover;">`;
+            // Local resized copy; the server falls back to the original URL if it has none
+            const thumbSrc = article.id ? `/thumb/${article.id}?w=320` : article.thumbnail;
+            iconHtml = `<img src="${thumbSrc}" alt="Article Image" loading="lazy" style="width:100%; height:100%; object-fit:cover;">`;
             useImage = true;
         } else {
             // Fallback icon logic